@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+dedup_filter 합성 벤치마크
+한국어/영어 합성 Reddit·뉴스 기사를 정해진 중복 비율로 만들어 단계별(정규화·스코어링·중복 제거·스트리밍 선택·주제 클러스터링)
+처리 시간, 처리량, 최대 메모리와 중복 탐지 정밀도/재현율을 측정
+
+사용법:
+    python scripts/benchmark_dedup.py                             # 100, 1k, 10k, 100k건
+    python scripts/benchmark_dedup.py 100,1000 --dup-rate=0.3     # 크기/중복 비율 지정
+    python scripts/benchmark_dedup.py --no-memory                 # 메모리 측정 생략 (tracemalloc은 처리 시간을 몇 배 늘림)
+    python scripts/benchmark_dedup.py --output=bench.json         # 결과를 JSON으로도 저장
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import tracemalloc
+from datetime import datetime, timedelta
+from dedup_filter import prepare_article, score_features, select_top_articles, TOPIC_CANDIDATES
+from topic_clusters import cluster_documents
+
+# 기본 측정 크기 / 중복 비율 / 한국어 기사 비율 / 시드
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+DEFAULT_DUP_RATE = 0.2
+KOREAN_RATIO = 0.5
+SEED = 7
+
+# 변형에 쓰는 조사와 영어 어미
+PARTICLES = ['이', '가', '은', '는', '을', '를', '의', '에서', '으로', '와']
+ENGLISH_ENDINGS = ['s', 'ing', 'ed', '']
+
+class CorpusGenerator:
+    """그룹 번호(정답)가 붙은 합성 기사 생성기"""
+
+    def __init__(self, seed=SEED):
+        self.rng = random.Random(seed)
+        syllables = [chr(code) for code in range(0xAC00, 0xAC00 + 800)]
+        self.nouns = [''.join(self.rng.choice(syllables) for _ in range(self.rng.randint(2, 4))) for _ in range(8000)]
+        self.words = [''.join(self.rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(self.rng.randint(3, 9)))
+                      for _ in range(8000)]
+        self.now = datetime.now()
+
+    def _korean(self, count):
+        return [(self.rng.choice(self.nouns), self.rng.choice(PARTICLES)) for _ in range(count)]
+
+    def _english(self, count):
+        return [(self.rng.choice(self.words), '') for _ in range(count)]
+
+    @staticmethod
+    def _render(words):
+        return ' '.join(word + suffix for word, suffix in words)
+
+    def _perturb(self, words, korean):
+        """조사/어미 교체, 띄어쓰기 변경, 단어 일부 교체 중 하나로 근접 중복 생성"""
+        kind = self.rng.choice(['inflection', 'spacing', 'edit'])
+        if kind == 'inflection':
+            endings = PARTICLES if korean else ENGLISH_ENDINGS
+            return self._render([(word, self.rng.choice(endings)) if self.rng.random() < 0.5 else (word, suffix)
+                                 for word, suffix in words])
+        if kind == 'spacing' and korean:
+            return ''.join(ch for ch in self._render(words) if ch != ' ' or self.rng.random() > 0.3)
+        edited = list(words)
+        for _ in range(max(1, len(edited) // 20)):
+            edited[self.rng.randrange(len(edited))] = (self._korean if korean else self._english)(1)[0]
+        return self._render(edited)
+
+    def generate(self, size, dup_rate):
+        """size건 생성 (약 dup_rate 비율이 앞선 기사의 근접 중복), 순서는 섞음"""
+        originals = []
+        articles = []
+        for position in range(size):
+            if originals and self.rng.random() < dup_rate:
+                group, korean, title, content = self.rng.choice(originals)
+                title_text, content_text = self._perturb(title, korean), self._perturb(content, korean)
+            else:
+                korean = self.rng.random() < KOREAN_RATIO
+                make = self._korean if korean else self._english
+                title, content = make(self.rng.randint(5, 12)), make(self.rng.randint(40, 120))
+                group = len(originals)
+                originals.append((group, korean, title, content))
+                title_text, content_text = self._render(title), self._render(content)
+
+            reddit = position % 2 == 0
+            articles.append({
+                'title': title_text,
+                'content': content_text,
+                'source': 'Reddit r/stocks' if reddit else 'NewsAPI',
+                'url': f"https://example.com/{position}",
+                'reddit_id': f"b{position}" if reddit else '',
+                'published_at': (self.now - timedelta(hours=self.rng.uniform(0, 36))).isoformat(),
+                '_group': group
+            })
+        self.rng.shuffle(articles)
+        return articles
+
+def duplicate_quality(articles, kept):
+    """그룹 정답 대비 중복 제거 정밀도/재현율
+
+    그룹마다 (크기 - 1)건이 제거돼야 하며, 그룹 안에서 그보다 많이 지웠거나 단독 기사를 지웠으면 오탐으로 센다.
+    """
+    sizes, removed = {}, {}
+    kept_ids = {id(article) for article in kept}
+    for article in articles:
+        group = article['_group']
+        sizes[group] = sizes.get(group, 0) + 1
+        if id(article) not in kept_ids:
+            removed[group] = removed.get(group, 0) + 1
+
+    true_positive = sum(min(count, sizes[group] - 1) for group, count in removed.items())
+    total_removed = sum(removed.values())
+    total_duplicates = sum(size - 1 for size in sizes.values())
+    precision = true_positive / total_removed if total_removed else 1.0
+    recall = true_positive / total_duplicates if total_duplicates else 1.0
+    return precision, recall
+
+def measure(stage, func, size, track_memory):
+    """func()를 실행해 (결과, 측정값) 반환"""
+    if track_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1e6 if track_memory else None
+    return result, {
+        'stage': stage,
+        'size': size,
+        'seconds': round(elapsed, 4),
+        'per_second': round(size / elapsed) if elapsed > 0 else None,
+        'peak_mb': round(peak_mb, 2) if peak_mb is not None else None
+    }
+
+def run_size(size, dup_rate, track_memory, seed=SEED):
+    """크기 1개에 대해 모든 단계 측정"""
+    corpus = CorpusGenerator(seed).generate(size, dup_rate)
+    rows = []
+
+    features, row = measure('normalize', lambda: [prepare_article(article) for article in corpus], size, track_memory)
+    rows.append(row)
+
+    _, row = measure('score', lambda: score_features(features), size, track_memory)
+    rows.append(row)
+    del features
+
+    # main과 같은 select_top_articles로 중복 제거 품질 측정 (k를 전체 크기로 두면 통과한 기사 전부가 남음)
+    # 기사에 필드를 덧붙이므로 사본을 넘기고, 결과는 URL로 원본과 다시 맞춤
+    (kept, kept_features, _), row = measure('dedup', lambda: select_top_articles((dict(article) for article in corpus), k=size),
+                             size, track_memory)
+    kept_urls = {article['url'] for article in kept}
+    precision, recall = duplicate_quality(corpus, [article for article in corpus if article['url'] in kept_urls])
+    row.update({'precision': round(precision, 4), 'recall': round(recall, 4), 'kept': len(kept)})
+    rows.append(row)
+
+    _, row = measure('stream_topk', lambda: select_top_articles((dict(article) for article in corpus), k=TOPIC_CANDIDATES),
+                     size, track_memory)
+    rows.append(row)
+
+    documents = [features.tokens for features in kept_features]
+    _, row = measure('cluster', lambda: cluster_documents(documents), len(kept), track_memory)
+    rows.append(row)
+    return rows
+
+def print_rows(rows):
+    """측정 결과 표 출력"""
+    print(f"{'크기':>8} {'단계':<12} {'초':>9} {'건/초':>10} {'최대 MB':>9} {'정밀도':>7} {'재현율':>7}")
+    for row in rows:
+        print(f"{row['size']:>8} {row['stage']:<12} {row['seconds']:>9.3f} {row['per_second'] or '-':>10} "
+              f"{row['peak_mb'] if row['peak_mb'] is not None else '-':>9} "
+              f"{row.get('precision', ''):>7} {row.get('recall', ''):>7}")
+
+def _option(name, default=None):
+    """--name=value 형식 인자 값"""
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+def main():
+    """벤치마크 CLI"""
+    positional = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    try:
+        sizes = [int(value) for value in positional[0].split(',') if value] if positional else DEFAULT_SIZES
+        dup_rate = float(_option('dup-rate', DEFAULT_DUP_RATE))
+        seed = int(_option('seed', SEED))
+    except ValueError:
+        print(__doc__)
+        return 1
+    output = _option('output')
+
+    # 단계별 진행 로그는 숨김
+    logging.disable(logging.INFO)
+
+    track_memory = '--no-memory' not in sys.argv[1:]
+    if track_memory:
+        tracemalloc.start()
+
+    results = []
+    for size in sizes:
+        rows = run_size(size, dup_rate, track_memory, seed)
+        print_rows(rows)
+        results.extend(rows)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(), 'dup_rate': dup_rate, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,12 @@ Buffer 업로더 스크립트
 Buffer Publish API v2를 사용하여 IG Carousel과 Threads 포스트 업로드
 """
 
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 import logging
 from dotenv import load_dotenv
+from http_session import get_session
 
 # 환경 변수 로드
 load_dotenv()
@@ -103,7 +103,7 @@ def upload_instagram_carousel(image_paths, caption, scheduled_time):
             }
         }
         
-        response = requests.post(url, headers=headers, data=payload)
+        response = get_session().post(url, headers=headers, data=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -149,7 +149,7 @@ def upload_threads_post(thread_data, scheduled_time):
             }
         }
         
-        response = requests.post(url, headers=headers, data=payload)
+        response = get_session().post(url, headers=headers, data=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -168,7 +168,7 @@ def upload_threads_post(thread_data, scheduled_time):
                     }
                 }
                 
-                comment_response = requests.post(url, headers=headers, data=comment_payload)
+                comment_response = get_session().post(url, headers=headers, data=comment_payload)
                 
                 if comment_response.status_code == 200:
                     comment_result = comment_response.json()
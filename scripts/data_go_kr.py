@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+공공데이터포털(data.go.kr) 요청 클라이언트
+XML 응답을 스트리밍으로 파싱하고, 여러 basDt 조회를 하나의 커넥션 풀에서 동시에 요청
+비동기 경로(fetch_items/fetch_all_pages)는 본문을 메모리에 모으지 않고 청크 단위로 파싱하므로
+http_cache를 거치지 않는다 (캐시·오프라인 대체는 동기 경로에서만 적용)
+"""
+
+import os
+import asyncio
+import logging
+import aiohttp
+from lxml import etree
+from dotenv import load_dotenv
+from quota_ledger import record
+
+# 환경변수 로드
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 비동기 모드 사용 여부
+USE_ASYNC = os.getenv('DATA_GO_KR_ASYNC', 'false').lower() == 'true'
+
+# 동시 요청 한도 (서비스 트래픽 쿼터 기준)
+MAX_CONCURRENCY = int(os.getenv('DATA_GO_KR_CONCURRENCY', '5'))
+
+# 요청 1건당 타임아웃 (초)
+REQUEST_TIMEOUT = 10
+
+# 전체 시장 조회 시 페이지당 행 수
+BULK_PAGE_SIZE = int(os.getenv('DATA_GO_KR_PAGE_SIZE', '1000'))
+
+# 응답 청크 크기 (바이트)
+CHUNK_SIZE = 64 * 1024
+
+# 정상 응답 코드
+NORMAL_RESULT_CODE = '00'
+
+# 숫자형 필드 변환 규칙 (나머지는 문자열 유지)
+FLOAT_FIELDS = {'clpr', 'vs', 'fltRt', 'mkp', 'hipr', 'lopr'}
+INT_FIELDS = {'trqu', 'trPrc', 'lstgStCnt', 'mrktTotAmt', 'lstgMrktTotAmt', 'epyItmsCnt',
+              'numOfRows', 'pageNo', 'totalCount'}
+
+class DataGoKrError(Exception):
+    """data.go.kr 응답의 resultCode/returnReasonCode 오류"""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+def _convert(tag, text):
+    """필드 값을 타입에 맞게 변환"""
+    if text is None:
+        return None
+    text = text.strip()
+    try:
+        if tag in FLOAT_FIELDS:
+            return float(text)
+        if tag in INT_FIELDS:
+            return int(text)
+    except ValueError:
+        return None
+    return text
+
+class ItemStreamParser:
+    """XML 응답을 청크 단위로 받아 <item> 요소를 레코드로 변환하는 증분 파서
+
+    header의 resultCode가 정상이 아니거나 cmmMsgHeader 오류 응답이면
+    DataGoKrError를 발생시킨다. 페이지 정보(totalCount 등)는 meta에 담긴다.
+    """
+
+    def __init__(self):
+        self._parser = etree.XMLPullParser(events=('end',))
+        self.meta = {}
+
+    def feed(self, chunk):
+        """청크를 입력하고 완성된 레코드 목록 반환"""
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self):
+        """입력 종료 후 남은 레코드 목록 반환"""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self):
+        records = []
+        for _, elem in self._parser.read_events():
+            tag = elem.tag
+            if tag == 'item':
+                records.append({child.tag: _convert(child.tag, child.text) for child in elem})
+                # 처리한 요소는 바로 해제해 메모리 사용량을 페이지 크기와 무관하게 유지
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            elif tag in ('resultCode', 'resultMsg', 'returnReasonCode', 'returnAuthMsg', 'errMsg'):
+                self.meta[tag] = (elem.text or '').strip()
+            elif tag in ('numOfRows', 'pageNo', 'totalCount'):
+                self.meta[tag] = _convert(tag, elem.text)
+            elif tag == 'header':
+                code = self.meta.get('resultCode')
+                if code != NORMAL_RESULT_CODE:
+                    raise DataGoKrError(code, self.meta.get('resultMsg', ''))
+            elif tag == 'cmmMsgHeader':
+                raise DataGoKrError(
+                    self.meta.get('returnReasonCode'),
+                    self.meta.get('returnAuthMsg') or self.meta.get('errMsg', '')
+                )
+        return records
+
+def iter_items(chunks, meta=None):
+    """바이트 청크 이터러블에서 <item> 레코드를 순차적으로 생성"""
+    parser = ItemStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+    if meta is not None:
+        meta.update(parser.meta)
+
+def has_items(body):
+    """서비스 오류 없이 item이 1건 이상 있는 응답 본문인지 (http_cache 저장 여부 판단용)"""
+    try:
+        return any(True for _ in iter_items([body]))
+    except (DataGoKrError, etree.XMLSyntaxError):
+        return False
+
+def find_item(items, key, value):
+    """여러 item 중 key가 value와 일치하는 레코드 반환 (없으면 None)
+
+    이름이 바뀐 지수나 일부만 온 페이지에서 다른 항목의 값을 잘못 쓰지 않도록 첫 번째 항목으로 대체하지 않는다.
+    """
+    for item in items:
+        if item.get(key) == value:
+            return item
+    if items:
+        logger.warning(f"⚠️ {key}={value} 일치 항목 없음 (응답 {len(items)}건: {[item.get(key) for item in items[:5]]})")
+    return None
+
+async def _request_items(session, url, params):
+    """요청 1건을 스트리밍 파싱해 (레코드 목록, 페이지 정보) 반환"""
+    async with session.get(url, params=params) as response:
+        record('data.go.kr', status=response.status)
+        if response.status != 200:
+            raise aiohttp.ClientResponseError(
+                response.request_info, response.history, status=response.status
+            )
+        parser = ItemStreamParser()
+        items = []
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            items.extend(parser.feed(chunk))
+        items.extend(parser.close())
+        return items, parser.meta
+
+async def _fetch_items(session, semaphore, url, params, label):
+    """요청 1건 실행 (실패 시 로그를 남기고 None)"""
+    async with semaphore:
+        try:
+            items, _ = await _request_items(session, url, params)
+            return items
+        except DataGoKrError as e:
+            logger.warning(f"⚠️ {label} 서비스 오류: {e}")
+            return None
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"⚠️ {label} 응답 형식 오류: {e}")
+            return None
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ {label} 요청 타임아웃 ({REQUEST_TIMEOUT}초)")
+            return None
+        except aiohttp.ClientResponseError as e:
+            logger.warning(f"⚠️ {label} 요청 실패: {e.status}")
+            return None
+        except aiohttp.ClientError as e:
+            logger.warning(f"⚠️ {label} 수집 중 오류: {e}")
+            return None
+
+def _new_session(concurrency):
+    """동시 요청 한도에 맞춘 커넥션 풀 세션 생성"""
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+async def fetch_items_async(url, params_list, labels=None, concurrency=MAX_CONCURRENCY):
+    """파라미터 목록을 동시에 요청하고 입력 순서대로 item 레코드 목록 반환 (http_cache 미사용, 매번 API 호출)"""
+    labels = labels or [str(i) for i in range(len(params_list))]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with _new_session(concurrency) as session:
+        tasks = [
+            _fetch_items(session, semaphore, url, params, label)
+            for params, label in zip(params_list, labels)
+        ]
+        return await asyncio.gather(*tasks)
+
+def fetch_items(url, params_list, labels=None, concurrency=MAX_CONCURRENCY):
+    """fetch_items_async의 동기 진입점"""
+    if not params_list:
+        return []
+    return asyncio.run(fetch_items_async(url, params_list, labels, concurrency))
+
+async def fetch_all_pages_async(url, params, page_size=BULK_PAGE_SIZE, concurrency=MAX_CONCURRENCY):
+    """첫 페이지로 totalCount를 확인한 뒤 나머지 페이지를 동시에 요청해 전체 item 반환
+
+    첫 페이지 오류(DataGoKrError 등)는 그대로 전달해 호출 측에서 대체 경로를 고르게 한다.
+    http_cache를 거치지 않으므로 호출할 때마다 전체 페이지를 다시 요청한다.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with _new_session(concurrency) as session:
+        first_params = dict(params, numOfRows=page_size, pageNo=1)
+        items, meta = await _request_items(session, url, first_params)
+
+        total_count = meta.get('totalCount') or 0
+        page_count = -(-total_count // page_size)
+        tasks = [
+            _fetch_items(session, semaphore, url, dict(params, numOfRows=page_size, pageNo=page_no), f"page {page_no}")
+            for page_no in range(2, page_count + 1)
+        ]
+        pages = await asyncio.gather(*tasks)
+
+    missing_pages = [page_no for page_no, page in zip(range(2, page_count + 1), pages) if page is None]
+    for page in pages:
+        if page:
+            items.extend(page)
+
+    if missing_pages:
+        logger.warning(f"⚠️ 누락된 페이지: {missing_pages}")
+    logger.info(f"✅ 전체 페이지 수집 완료: {len(items)}/{total_count}건 ({page_count}페이지)")
+    return items
+
+def fetch_all_pages(url, params, page_size=BULK_PAGE_SIZE, concurrency=MAX_CONCURRENCY):
+    """fetch_all_pages_async의 동기 진입점"""
+    return asyncio.run(fetch_all_pages_async(url, params, page_size, concurrency))
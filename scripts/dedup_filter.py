@@ -8,16 +8,66 @@ import json
 import os
 from datetime import datetime
 import logging
-from difflib import SequenceMatcher
 import re
+import heapq
+from itertools import islice
+from email.utils import parsedate_to_datetime
+from collections import namedtuple
+import numpy as np
+from near_duplicate import NearDuplicateIndex, similarity
+from published_index import PublishedIndex
+from keyword_matcher import KEYWORDS, KeywordAutomaton
+from text_tokenizer import tokenize, compact, shingles
+from topic_clusters import pick_topics
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 텍스트 정제 패턴 (모듈 로드 시 한 번만 컴파일)
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s가-힣]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+CHARS_SUFFIX_PATTERN = re.compile(r'\s*\[\+\d+ chars\]$')
+
+# 스코어 가중치
+SCORE_BASE = 10
+TITLE_LENGTH_BONUS = ((20, 100, 5), (101, float('inf'), 2))       # (최소, 최대, 가산점) 원문 제목 길이
+CONTENT_LENGTH_BONUS = ((200, 1000, 10), (1001, float('inf'), 15))  # (최소, 최대, 가산점) 원문 본문 길이
+TITLE_KEYWORD_WEIGHT = float(os.getenv('SCORE_TITLE_KEYWORD_WEIGHT', '3'))      # 제목 키워드 1개당
+CONTENT_KEYWORD_WEIGHT = float(os.getenv('SCORE_CONTENT_KEYWORD_WEIGHT', '1'))  # 본문 키워드 1개당
+DECAY_HOURS = float(os.getenv('SCORE_DECAY_HOURS', '24'))  # 이 시간이 지나면 시간 가중치 최저
+MIN_TIME_WEIGHT = 0.1
+
+# 최종 선택 기사 수
+TOP_ARTICLES = 5
+
+# 주제 클러스터링에 넘길 상위 후보 수 (주제마다 대표 1개만 최종 선택)
+TOPIC_CANDIDATES = int(os.getenv('TOPIC_CANDIDATES', '50'))
+
+# 스트리밍 선택 시 한 번에 전처리·스코어링하는 기사 수 (메모리 상한)
+STREAM_BATCH_SIZE = 256
+
+# 날짜 폴더 안의 입력 소스 파일 (있는 파일만 순서대로 읽음)
+SOURCE_FILES = ['reddit.jsonl', 'news.jsonl', 'rss.jsonl']
+
+# 스코어 키워드 매처 (키워드도 기사와 같은 토크나이저로 정규화해 'S&P 500'/'S&P500'을 같게 취급)
+# 공백으로 이은 토큰에 단어 단위로 맞춰야 'AI'가 'said'/'maintain' 안에서 잡히지 않음
+score_automaton = KeywordAutomaton([' '.join(tokenize(keyword)) for keyword in KEYWORDS])
+
+# 기사별 전처리 결과 (정제·중복 제거·스코어 계산이 모두 재사용)
+# title/content: 정제 텍스트, title_key/content_key: 정규화 토큰을 공백 없이 이은 문자열 (중복 비교용)
+# tokens: 정규화 토큰 (조사 제거·어간 추출), title_keywords/content_keywords: 찾은 키워드 수
+# title_length/content_length: 원문 길이
+# length: 정제 텍스트 길이 합, published_ts: 발행 시각(epoch 초, 없으면 NaN), shingle_sets: 중복 색인용 슁글
+ArticleFeatures = namedtuple('ArticleFeatures', [
+    'title', 'content', 'title_key', 'content_key', 'tokens', 'title_keywords', 'content_keywords',
+    'title_length', 'content_length', 'length', 'published_ts', 'shingle_sets'
+])
+
 def calculate_similarity(text1, text2):
     """두 텍스트 간의 유사도 계산"""
-    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+    return similarity(text1, text2)
 
 def clean_text(text):
     """텍스트 정제"""
@@ -25,93 +75,143 @@ def clean_text(text):
         return ""
     
     # HTML 태그 제거
-    text = re.sub(r'<[^>]+>', '', text)
+    text = HTML_TAG_PATTERN.sub('', text)
     # 특수문자 정리
-    text = re.sub(r'[^\w\s가-힣]', ' ', text)
+    text = SPECIAL_CHAR_PATTERN.sub(' ', text)
     # 연속 공백 제거
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
     
     return text
 
-def filter_articles(articles, min_length=200, similarity_threshold=0.8):
-    """기사 필터링 및 중복 제거"""
+def parse_published(value):
+    """발행 시각 문자열을 epoch 초로 변환 (시간대 없는 값은 로컬 시각, 실패 시 NaN)"""
+    if not value:
+        return float('nan')
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (TypeError, ValueError):
+        return float('nan')
+
+def prepare_article(article):
+    """기사 1건을 한 번만 정규화해 전처리 결과 생성"""
+    raw_title = article.get('title') or ''
+    raw_content = article.get('content') or ''
+    title = clean_text(raw_title)
+    content = clean_text(raw_content)
+    title_tokens = tokenize(title)
+    content_tokens = tokenize(content)
+    title_key = compact(title_tokens)
+    content_key = compact(content_tokens)
+    
+    return ArticleFeatures(
+        title=title,
+        content=content,
+        title_key=title_key,
+        content_key=content_key,
+        tokens=tuple(title_tokens + content_tokens),
+        title_keywords=score_automaton.count(' '.join(title_tokens), whole_word=True),
+        content_keywords=score_automaton.count(' '.join(content_tokens), whole_word=True),
+        title_length=len(raw_title),
+        content_length=len(raw_content),
+        length=len(title) + len(content),
+        published_ts=parse_published(article.get('published_at')),
+        shingle_sets={'title': shingles(title_tokens), 'content': shingles(content_tokens)}
+    )
+
+def filter_articles(articles, min_length=200, similarity_threshold=0.8, published=None):
+    """기사 필터링 및 중복 제거
+
+    제목 또는 본문 유사도가 similarity_threshold를 넘는 기사는 중복으로 본다.
+    MinHash/LSH 색인으로 비슷한 후보만 비교하므로 기사 수에 선형으로 확장된다.
+    published(PublishedIndex)를 주면 이전 날 이미 발행한 이야기도 걸러낸다.
+    """
     filtered_articles = []
+    filtered_features = []
+    index = NearDuplicateIndex(similarity_threshold)
+    republished = 0
     
     for article in articles:
-        # 텍스트 정제
-        title = clean_text(article.get('title', ''))
-        content = clean_text(article.get('content', ''))
+        # 텍스트 정규화 (기사당 한 번)
+        features = prepare_article(article)
         
         # 길이 체크
-        if len(title + content) < min_length:
+        if features.length < min_length:
+            continue
+        
+        # 이전 발행 이력 체크
+        if published is not None and published.seen(article, features.shingle_sets['content']):
+            republished += 1
             continue
         
         # 중복 체크
-        is_duplicate = False
-        for existing in filtered_articles:
-            existing_title = clean_text(existing.get('title', ''))
-            existing_content = clean_text(existing.get('content', ''))
-            
-            title_similarity = calculate_similarity(title, existing_title)
-            content_similarity = calculate_similarity(content, existing_content)
-            
-            if title_similarity > similarity_threshold or content_similarity > similarity_threshold:
-                is_duplicate = True
-                break
+        if not index.add_if_new(features.title_key, features.content_key, features.shingle_sets):
+            continue
         
-        if not is_duplicate:
-            # 스코어 계산
-            score = calculate_article_score(article)
-            article['cleaned_title'] = title
-            article['cleaned_content'] = content
-            article['filtered_score'] = score
-            filtered_articles.append(article)
+        article['cleaned_title'] = features.title
+        article['cleaned_content'] = features.content
+        filtered_articles.append(article)
+        filtered_features.append(features)
     
+    # 스코어 계산 (남은 기사 전체를 한 번에)
+    for article, score in zip(filtered_articles, score_features(filtered_features)):
+        article['filtered_score'] = float(score)
+    
+    if republished:
+        logger.info(f"🗂️ 이전에 발행한 이야기 {republished}개 제외")
+    logger.info(f"🔁 중복 후보 비교 {index.comparisons}회 (기사 {len(filtered_articles)}개 유지)")
     return filtered_articles
 
-def calculate_article_score(article):
-    """기사 스코어 계산"""
-    score = 0
-    
-    # 기본 점수
-    score += 10
-    
-    # 제목 길이 가중치
-    title_length = len(article.get('title', ''))
-    if 20 <= title_length <= 100:
-        score += 5
-    elif title_length > 100:
-        score += 2
-    
-    # 내용 길이 가중치
-    content_length = len(article.get('content', ''))
-    if 200 <= content_length <= 1000:
-        score += 10
-    elif content_length > 1000:
-        score += 15
-    
-    # 키워드 가중치
-    keywords = ['S&P500', 'KOSPI', 'FOMC', 'AI', 'Bitcoin', 'Tesla', 'Apple', 'NVIDIA']
-    title_lower = article.get('title', '').lower()
-    content_lower = article.get('content', '').lower()
-    
-    for keyword in keywords:
-        if keyword.lower() in title_lower:
-            score += 3
-        if keyword.lower() in content_lower:
-            score += 1
-    
-    # 시간 가중치 (최신 기사 우선)
-    if 'published_at' in article:
-        try:
-            published_time = datetime.fromisoformat(article['published_at'].replace('Z', '+00:00'))
-            hours_ago = (datetime.now() - published_time).total_seconds() / 3600
-            time_weight = max(0.1, 1 - (hours_ago / 24))  # 24시간 내 가중치
-            score *= time_weight
-        except:
-            pass
-    
-    return round(score, 2)
+def _length_bonus(lengths, brackets):
+    return np.select([(lengths >= low) & (lengths <= high) for low, high, _ in brackets],
+                     [bonus for _, _, bonus in brackets], 0)
+
+def score_features(features_list, now=None):
+    """전처리 결과 목록의 스코어를 numpy 배열로 한 번에 계산
+
+    기본 점수 + 길이 가산점 + 키워드 가중치에 시간 가중치(최신 기사 우선)를 곱한다.
+    """
+    if not features_list:
+        return np.zeros(0)
+    
+    title_lengths = np.array([f.title_length for f in features_list])
+    content_lengths = np.array([f.content_length for f in features_list])
+    title_keywords = np.array([f.title_keywords for f in features_list])
+    content_keywords = np.array([f.content_keywords for f in features_list])
+    published = np.array([f.published_ts for f in features_list], dtype=float)
+    
+    scores = (SCORE_BASE
+              + _length_bonus(title_lengths, TITLE_LENGTH_BONUS)
+              + _length_bonus(content_lengths, CONTENT_LENGTH_BONUS)
+              + TITLE_KEYWORD_WEIGHT * title_keywords
+              + CONTENT_KEYWORD_WEIGHT * content_keywords)
+    
+    # 시간 가중치 (발행 시각이 없으면 1)
+    hours_ago = ((now or datetime.now().timestamp()) - published) / 3600
+    time_weights = np.where(np.isnan(hours_ago), 1.0,
+                            np.maximum(MIN_TIME_WEIGHT, 1 - hours_ago / DECAY_HOURS))
+    
+    return np.round(scores * time_weights, 2)
+
+def calculate_article_score(article, features=None):
+    """기사 1건 스코어 계산 (features가 있으면 전처리 결과 재사용)"""
+    if features is None:
+        features = prepare_article(article)
+    return float(score_features([features])[0])
+
+def reddit_post_to_article(post):
+    """Reddit 게시물 1건을 뉴스 형태로 변환"""
+    return {
+        'title': post.get('title', ''),
+        'content': post.get('selftext', ''),
+        'source': f"Reddit r/{post.get('subreddit', '')}",
+        'url': post.get('url', ''),
+        'score': post.get('score', 0),
+        'comments': post.get('num_comments', 0),
+        'published_at': datetime.fromtimestamp(post.get('created_utc', 0)).isoformat(),
+        'author': post.get('author', ''),
+        'keyword': post.get('keyword', ''),
+        'reddit_id': post.get('id', '')
+    }
 
 def process_reddit_data(reddit_file):
     """Reddit 데이터를 뉴스 형태로 변환"""
@@ -119,27 +219,127 @@ def process_reddit_data(reddit_file):
         with open(reddit_file, 'r', encoding='utf-8') as f:
             reddit_data = json.load(f)
         
-        articles = []
-        for post in reddit_data.get('posts', []):
-            article = {
-                'title': post.get('title', ''),
-                'content': post.get('selftext', ''),
-                'source': f"Reddit r/{post.get('subreddit', '')}",
-                'url': post.get('url', ''),
-                'score': post.get('score', 0),
-                'comments': post.get('num_comments', 0),
-                'published_at': datetime.fromtimestamp(post.get('created_utc', 0)).isoformat(),
-                'author': post.get('author', ''),
-                'keyword': post.get('keyword', '')
-            }
-            articles.append(article)
-        
-        return articles
+        return [reddit_post_to_article(post) for post in reddit_data.get('posts', [])]
         
     except Exception as e:
         logger.error(f"❌ Reddit 데이터 처리 실패: {e}")
         return []
 
+def _iter_jsonl(path):
+    """JSONL 파일을 한 줄씩 읽음 (깨진 줄은 건너뜀)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def iter_reddit_jsonl(reddit_file):
+    """fetch_reddit가 남긴 reddit.jsonl을 한 줄씩 읽어 기사 형태로 변환"""
+    for post in _iter_jsonl(reddit_file):
+        yield reddit_post_to_article(post)
+
+def iter_news_jsonl(news_file):
+    """fetch_news --ingest가 쌓은 news.jsonl을 한 줄씩 읽어 기사 형태로 변환"""
+    for item in _iter_jsonl(news_file):
+        # NewsAPI content 끝의 '[+1234 chars]' 표시 제거
+        content = CHARS_SUFFIX_PATTERN.sub('', item.get('content', ''))
+        yield {
+            'title': item.get('title', ''),
+            'content': f"{item.get('description', '')} {content}".strip(),
+            'source': item.get('source', ''),
+            'url': item.get('url', ''),
+            'published_at': item.get('publishedAt', ''),
+            'keyword': item.get('query', '')
+        }
+
+def _rss_date(value):
+    """RSS pubDate(RFC 822) 또는 ISO 시각을 ISO 문자열로 변환"""
+    if not value:
+        return ''
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+def iter_rss_jsonl(rss_file):
+    """RSS 항목 JSONL(title, summary/description, link, published/pubDate, feed)을 기사 형태로 변환"""
+    for item in _iter_jsonl(rss_file):
+        yield {
+            'title': item.get('title', ''),
+            'content': item.get('summary') or item.get('description', ''),
+            'source': item.get('feed') or item.get('source', 'RSS'),
+            'url': item.get('link') or item.get('url', ''),
+            'published_at': _rss_date(item.get('published') or item.get('pubDate')),
+            'keyword': item.get('keyword', '')
+        }
+
+def iter_source_articles(date_str):
+    """날짜 폴더의 입력 소스를 차례로 읽는 기사 스트림 (reddit.jsonl이 없으면 reddit.json 사용)"""
+    readers = {'reddit.jsonl': iter_reddit_jsonl, 'news.jsonl': iter_news_jsonl, 'rss.jsonl': iter_rss_jsonl}
+    for filename in SOURCE_FILES:
+        path = f'data/{date_str}/{filename}'
+        if os.path.exists(path):
+            yield from readers[filename](path)
+        elif filename == 'reddit.jsonl' and os.path.exists(f'data/{date_str}/reddit.json'):
+            yield from process_reddit_data(f'data/{date_str}/reddit.json')
+
+def select_top_articles(articles, k=TOP_ARTICLES, min_length=200, similarity_threshold=0.8,
+                        published=None, batch_size=STREAM_BATCH_SIZE):
+    """기사 스트림에서 스코어 상위 k개를 선택 (기사 원문은 k + batch_size개만 보관)
+
+    articles는 리스트든 제너레이터든 batch_size개씩 끊어 전처리·스코어링하고, 크기 k인 힙만 유지한다.
+    중복 판정은 filter_articles와 같이 지금까지 통과한 모든 기사의 NearDuplicateIndex(MinHash/LSH)로
+    들어온 순서대로 하므로(먼저 들어온 기사가 남음), 결과는 filter_articles 결과의 스코어 상위 k개와 같다.
+    반환값은 (스코어 내림차순 기사 목록, 같은 순서의 ArticleFeatures 목록, 처리한 기사 수).
+    """
+    heap = []  # (스코어, -순번, 기사, 전처리 결과) 최소 힙 - 동점이면 나중 기사가 먼저 밀려남
+    index = NearDuplicateIndex(similarity_threshold)
+    processed = 0
+    republished = 0
+    iterator = iter(articles)
+    
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        
+        candidates = []
+        for article in batch:
+            processed += 1
+            features = prepare_article(article)
+            if features.length < min_length:
+                continue
+            if published is not None and published.seen(article, features.shingle_sets['content']):
+                republished += 1
+                continue
+            # 힙에서 밀려날 기사도 색인에는 넣어, 나중에 들어온 같은 이야기가 통과하지 않게 함
+            if not index.add_if_new(features.title_key, features.content_key, features.shingle_sets):
+                continue
+            candidates.append((processed, article, features))
+        
+        scores = score_features([features for _, _, features in candidates])
+        for (sequence, article, features), score in zip(candidates, scores):
+            entry = (float(score), -sequence)
+            # 힙이 찼는데 최하위보다 낮으면 버림
+            if len(heap) >= k and entry <= heap[0][:2]:
+                continue
+            
+            article['cleaned_title'] = features.title
+            article['cleaned_content'] = features.content
+            article['filtered_score'] = float(score)
+            item = (float(score), -sequence, article, features)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heapreplace(heap, item)
+    
+    if republished:
+        logger.info(f"🗂️ 이전에 발행한 이야기 {republished}개 제외")
+    logger.info(f"🔁 중복 후보 비교 {index.comparisons}회 (고유 기사 {len(index.texts)}개)")
+    ranked = sorted(heap, key=lambda item: item[:2], reverse=True)
+    return [item[2] for item in ranked], [item[3] for item in ranked], processed
+
 def save_clean_data(articles, date_str):
     """정제된 데이터 저장"""
     os.makedirs(f'data/{date_str}', exist_ok=True)
@@ -163,31 +363,26 @@ def main():
     
     # 오늘 날짜
     today = datetime.now().strftime('%Y-%m-%d')
-    reddit_file = f'data/{today}/reddit.json'
-    
-    if not os.path.exists(reddit_file):
-        logger.error(f"❌ Reddit 데이터 파일 없음: {reddit_file}")
-        return None
     
-    # Reddit 데이터를 뉴스 형태로 변환
-    articles = process_reddit_data(reddit_file)
+    # 입력 소스를 한 줄씩 읽으며 상위 후보만 유지 (이전 날 발행한 이야기 제외)
+    published = PublishedIndex.load()
+    candidates, features, processed = select_top_articles(iter_source_articles(today), k=TOPIC_CANDIDATES,
+                                                          published=published)
     
-    if not articles:
-        logger.error("❌ 처리할 기사가 없습니다")
+    if processed == 0:
+        logger.error(f"❌ 처리할 기사가 없습니다: data/{today}/ ({', '.join(SOURCE_FILES)})")
         return None
     
-    logger.info(f"📰 총 {len(articles)}개 기사 처리 시작")
-    
-    # 필터링 및 중복 제거
-    filtered_articles = filter_articles(articles)
-    
-    # 스코어 기준으로 정렬
-    filtered_articles.sort(key=lambda x: x['filtered_score'], reverse=True)
+    # 같은 이야기가 여러 자리를 차지하지 않도록 주제별 대표 기사만 선택 (전처리 토큰 재사용)
+    top_articles = pick_topics(candidates, TOP_ARTICLES, tokens=[f.tokens for f in features])
+    features_by_article = {id(article): f for article, f in zip(candidates, features)}
     
-    # 상위 5개만 선택
-    top_articles = filtered_articles[:5]
+    logger.info(f"✅ 필터링 완료: {processed}개 기사 중 {len(top_articles)}개 선택")
     
-    logger.info(f"✅ 필터링 완료: {len(top_articles)}개 기사 선택")
+    # 선택한 기사를 발행 이력에 기록
+    for article in top_articles:
+        published.add(article, features_by_article[id(article)].shingle_sets['content'])
+    published.save()
     
     # 정제된 데이터 저장
     filepath = save_clean_data(top_articles, today)
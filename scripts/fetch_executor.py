@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+공용 병렬 수집 실행기
+fetch_* 스크립트의 심볼/지수/서브레딧 단위 작업을 소스별 스레드 풀에서 동시에 실행
+"""
+
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 소스별 동시 실행 한도 (서비스 쿼터/차단 정책 고려)
+SOURCE_LIMITS = {
+    'yahoo': 8,
+    'data.go.kr': 4,
+    'newsapi': 3,
+    'reddit': 4,
+    'default': 4
+}
+
+# 작업 1건당 기본 타임아웃 (초)
+DEFAULT_TASK_TIMEOUT = float(os.getenv('FETCH_TASK_TIMEOUT', '15'))
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(source):
+    """소스별 공유 스레드 풀 반환 (최초 호출 시 생성)"""
+    with _executors_lock:
+        executor = _executors.get(source)
+        if executor is None:
+            max_workers = SOURCE_LIMITS.get(source, SOURCE_LIMITS['default'])
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"fetch-{source}")
+            _executors[source] = executor
+        return executor
+
+def _retire_executor(source, executor):
+    """타임아웃으로 버려진 작업이 슬롯을 붙잡고 있는 풀을 공유 목록에서 빼서, 다음 호출은 새 풀을 쓰게 함"""
+    with _executors_lock:
+        if _executors.get(source) is executor:
+            del _executors[source]
+    # 이미 실행 중인 스레드는 멈출 수 없으므로 기다리지 않음 (끝나면 스레드도 정리됨)
+    executor.shutdown(wait=False)
+
+def run_tasks(source, func, items, timeout=None, describe=str):
+    """items 각각에 func(item)을 병렬 실행하고 입력 순서대로 결과 반환
+
+    실패하거나 타임아웃된 작업의 결과는 None으로 채운다.
+    timeout은 작업이 스레드에서 실제로 실행을 시작한 시점부터 계산한다. 대기열에서 시작하지 못한 작업은
+    모든 작업이 timeout을 다 쓰는 경우의 소요 시간(timeout × 대기열 차례 수)이 지나면 취소한다.
+    이미 실행 중인 작업은 스레드를 멈출 수 없으므로 결과만 버리고(abandon) 계속 돌게 두며,
+    이 경우 해당 소스의 공유 풀을 새 풀로 바꿔 버려진 스레드가 이후 호출의 슬롯을 차지하지 않게 한다.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    timeout = DEFAULT_TASK_TIMEOUT if timeout is None else timeout
+    executor = get_executor(source)
+    started = [None] * len(items)
+
+    def wrap(index, item):
+        started[index] = time.monotonic()
+        return func(item)
+
+    batch_start = time.monotonic()
+    futures = [executor.submit(wrap, i, item) for i, item in enumerate(items)]
+    results = [None] * len(items)
+    max_workers = SOURCE_LIMITS.get(source, SOURCE_LIMITS['default'])
+    waves = -(-len(items) // max_workers)
+    queue_deadline = batch_start + timeout * waves
+    pending = set(range(len(items)))
+    abandoned = False
+
+    def deadline(index):
+        return started[index] + timeout if started[index] is not None else queue_deadline
+
+    while pending:
+        now = time.monotonic()
+        wait_for = min(deadline(i) for i in pending) - now
+        done, _ = wait([futures[i] for i in pending], timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+
+        now = time.monotonic()
+        for i in sorted(pending):
+            future = futures[i]
+            if future in done:
+                pending.discard(i)
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ [{source}] {describe(items[i])} 작업 실패: {e}")
+            elif deadline(i) <= now:
+                pending.discard(i)
+                # 대기 중이면 취소되고, 실행 중이면 결과만 버림
+                if not future.cancel():
+                    abandoned = True
+                logger.warning(f"⚠️ [{source}] {describe(items[i])} 작업 타임아웃 ({timeout:.0f}초)")
+
+    if abandoned:
+        _retire_executor(source, executor)
+
+    elapsed = time.monotonic() - batch_start
+    succeeded = sum(1 for result in results if result is not None)
+    logger.info(f"⚡ [{source}] 병렬 수집 완료: {succeeded}/{len(items)}건, {elapsed:.2f}초")
+    return results
+
+def shutdown():
+    """모든 소스별 스레드 풀 종료"""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
@@ -4,12 +4,16 @@
 Yahoo Finance에서 KOSPI, KOSDAQ 종목 데이터 수집
 """
 
-import yfinance as yf
+import sys
+import pandas as pd
 import json
 import os
 from datetime import datetime, timedelta
 import logging
 from dotenv import load_dotenv
+from quote_engine import download_quotes, period_changes
+from live_quotes import poll, is_trading_today
+from market_calendar import plan_session
 
 # 환경변수 로드
 load_dotenv()
@@ -18,129 +22,73 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_kr_data(date_str):
-    """Yahoo Finance에서 한국 시장 데이터 수집"""
+# 수집 대상 심볼 테이블 (Yahoo Finance 형식)
+# type: index(지수) / stock(종목), market: 결과를 묶을 시장 구분
+KR_SYMBOLS = [
+    {'symbol': '^KS11', 'name': 'KOSPI', 'market': 'KOSPI', 'type': 'index'},
+    {'symbol': '^KQ11', 'name': 'KOSDAQ', 'market': 'KOSDAQ', 'type': 'index'},
+    # KOSPI 대표주
+    {'symbol': '005930.KS', 'name': '삼성전자', 'market': 'KOSPI', 'type': 'stock'},
+    {'symbol': '000660.KS', 'name': 'SK하이닉스', 'market': 'KOSPI', 'type': 'stock'},
+    {'symbol': '373220.KS', 'name': 'LG에너지솔루션', 'market': 'KOSPI', 'type': 'stock'},
+    {'symbol': '207940.KS', 'name': '삼성바이오로직스', 'market': 'KOSPI', 'type': 'stock'},
+    {'symbol': '035420.KS', 'name': 'NAVER', 'market': 'KOSPI', 'type': 'stock'},
+    # KOSDAQ 대표주
+    {'symbol': '068270.KQ', 'name': '셀트리온', 'market': 'KOSDAQ', 'type': 'stock'},
+    {'symbol': '051910.KS', 'name': 'LG화학', 'market': 'KOSDAQ', 'type': 'stock'},
+    {'symbol': '005380.KS', 'name': '현대차', 'market': 'KOSDAQ', 'type': 'stock'},
+    {'symbol': '000270.KS', 'name': '기아', 'market': 'KOSDAQ', 'type': 'stock'},
+    {'symbol': '005490.KS', 'name': 'POSCO홀딩스', 'market': 'KOSDAQ', 'type': 'stock'}
+]
+
+# KOSPI200/KOSDAQ150 등 추가 종목 CSV (symbol,name,market 컬럼)
+KR_SYMBOLS_FILE = os.getenv('KR_SYMBOLS_FILE')
+
+# 결과 프레임 컬럼 순서
+KR_COLUMNS = ['symbol', 'name', 'market', 'type', 'close', 'change', 'change_pct',
+              'open', 'high', 'low', 'volume', 'date']
+
+def load_symbol_table(path=KR_SYMBOLS_FILE):
+    """수집 대상 심볼 테이블 로드 (기본 테이블 + 추가 CSV)"""
+    table = pd.DataFrame(KR_SYMBOLS)
+    
+    if path and os.path.exists(path):
+        try:
+            extra = pd.read_csv(path, dtype=str)
+            extra['type'] = extra.get('type', 'stock')
+            table = pd.concat([table, extra[['symbol', 'name', 'market', 'type']]], ignore_index=True)
+            logger.info(f"📋 추가 종목 로드: {path} ({len(extra)}개)")
+        except Exception as e:
+            logger.warning(f"⚠️ 추가 종목 파일 로드 실패: {e}")
+    
+    return table.drop_duplicates(subset='symbol').set_index('symbol')
+
+def build_kr_frame(table, quotes, date_str):
+    """심볼 테이블과 시세를 합쳐 KR_COLUMNS 프레임 생성"""
+    frame = table.join(quotes, how='inner')
+    frame['date'] = date_str
+    return frame.rename_axis('symbol').reset_index()[KR_COLUMNS]
+
+def fetch_kr_data(date_str, update=True):
+    """Yahoo Finance에서 한국 시장 데이터 수집 (update=False면 로컬 이력만 사용)"""
     try:
-        # 한국 주요 종목 심볼 (Yahoo Finance 형식)
-        kospi_stocks = {
-            '005930.KS': '삼성전자',
-            '000660.KS': 'SK하이닉스', 
-            '373220.KS': 'LG에너지솔루션',
-            '207940.KS': '삼성바이오로직스',
-            '035420.KS': 'NAVER'
-        }
-        
-        kosdaq_stocks = {
-            '068270.KQ': '셀트리온',
-            '051910.KS': 'LG화학',
-            '005380.KS': '현대차',
-            '000270.KS': '기아',
-            '005490.KS': 'POSCO홀딩스'
-        }
-        
-        # KOSPI, KOSDAQ 지수
-        indices = {
-            '^KS11': 'KOSPI',
-            '^KQ11': 'KOSDAQ'
-        }
-        
-        all_data = []
-        
-        # 지수 데이터 수집
-        for symbol, name in indices.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
-                
-                if len(hist) >= 2:
-                    current = hist.iloc[-1]
-                    previous = hist.iloc[-2]
-                    
-                    index_data = {
-                        'symbol': symbol,
-                        'name': name,
-                        'close': float(current['Close']),
-                        'change': float(current['Close'] - previous['Close']),
-                        'change_pct': float((current['Close'] - previous['Close']) / previous['Close'] * 100),
-                        'open': float(current['Open']),
-                        'high': float(current['High']),
-                        'low': float(current['Low']),
-                        'volume': int(current['Volume']),
-                        'date': date_str
-                    }
-                    all_data.append(index_data)
-                    logger.info(f"✅ {name} 지수 데이터 수집 완료: {index_data['close']:.2f} ({index_data['change_pct']:+.2f}%)")
-                else:
-                    logger.warning(f"⚠️ {name} 지수 데이터 부족")
-            except Exception as e:
-                logger.warning(f"⚠️ {name} 지수 수집 중 오류: {e}")
-        
-        # KOSPI 대표주 데이터 수집
-        for symbol, name in kospi_stocks.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
-                
-                if len(hist) >= 2:
-                    current = hist.iloc[-1]
-                    previous = hist.iloc[-2]
-                    
-                    stock_data = {
-                        'symbol': symbol,
-                        'name': name,
-                        'close': float(current['Close']),
-                        'change': float(current['Close'] - previous['Close']),
-                        'change_pct': float((current['Close'] - previous['Close']) / previous['Close'] * 100),
-                        'open': float(current['Open']),
-                        'high': float(current['High']),
-                        'low': float(current['Low']),
-                        'volume': int(current['Volume']),
-                        'market': 'KOSPI',
-                        'date': date_str
-                    }
-                    all_data.append(stock_data)
-                    logger.info(f"✅ {name} 데이터 수집 완료: {stock_data['close']:.0f}원 ({stock_data['change_pct']:+.2f}%)")
-                else:
-                    logger.warning(f"⚠️ {name} 데이터 부족")
-            except Exception as e:
-                logger.warning(f"⚠️ {name} 수집 중 오류: {e}")
+        table = load_symbol_table()
+        quotes, missing = download_quotes(table.index.tolist(), update=update)
         
-        # KOSDAQ 대표주 데이터 수집
-        for symbol, name in kosdaq_stocks.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
-                
-                if len(hist) >= 2:
-                    current = hist.iloc[-1]
-                    previous = hist.iloc[-2]
-                    
-                    stock_data = {
-                        'symbol': symbol,
-                        'name': name,
-                        'close': float(current['Close']),
-                        'change': float(current['Close'] - previous['Close']),
-                        'change_pct': float((current['Close'] - previous['Close']) / previous['Close'] * 100),
-                        'open': float(current['Open']),
-                        'high': float(current['High']),
-                        'low': float(current['Low']),
-                        'volume': int(current['Volume']),
-                        'market': 'KOSDAQ',
-                        'date': date_str
-                    }
-                    all_data.append(stock_data)
-                    logger.info(f"✅ {name} 데이터 수집 완료: {stock_data['close']:.0f}원 ({stock_data['change_pct']:+.2f}%)")
-                else:
-                    logger.warning(f"⚠️ {name} 데이터 부족")
-            except Exception as e:
-                logger.warning(f"⚠️ {name} 수집 중 오류: {e}")
-        
-        if not all_data:
+        if quotes.empty:
             logger.warning("⚠️ 수집된 데이터가 없습니다. 더미 데이터를 사용합니다.")
             return generate_dummy_data(date_str)
         
-        logger.info(f"✅ Yahoo Finance 데이터 수집 완료: {date_str} (총 {len(all_data)}개)")
-        return all_data
+        frame = build_kr_frame(table, quotes, date_str)
+        
+        for row in frame[frame['type'] == 'index'].itertuples():
+            logger.info(f"✅ {row.name} 지수 데이터 수집 완료: {row.close:.2f} ({row.change_pct:+.2f}%)")
+        if missing:
+            names = table.loc[missing, 'name'].tolist()
+            logger.warning(f"⚠️ 데이터 부족: {', '.join(names)}")
+        
+        logger.info(f"✅ Yahoo Finance 데이터 수집 완료: {date_str} (총 {len(frame)}개)")
+        return frame
         
     except Exception as e:
         logger.error(f"❌ Yahoo Finance 데이터 수집 실패: {e}")
@@ -155,6 +103,8 @@ def generate_dummy_data(date_str):
         {
             'symbol': '^KS11',
             'name': 'KOSPI',
+            'market': 'KOSPI',
+            'type': 'index',
             'close': 2650.50,
             'change': 25.30,
             'change_pct': 0.96,
@@ -168,6 +118,8 @@ def generate_dummy_data(date_str):
         {
             'symbol': '^KQ11',
             'name': 'KOSDAQ',
+            'market': 'KOSDAQ',
+            'type': 'index',
             'close': 850.20,
             'change': 8.50,
             'change_pct': 1.01,
@@ -189,6 +141,7 @@ def generate_dummy_data(date_str):
             'low': 73000.0,
             'volume': 15000000,
             'market': 'KOSPI',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -202,6 +155,7 @@ def generate_dummy_data(date_str):
             'low': 116500.0,
             'volume': 8000000,
             'market': 'KOSPI',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -215,6 +169,7 @@ def generate_dummy_data(date_str):
             'low': 443000.0,
             'volume': 3000000,
             'market': 'KOSPI',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -228,6 +183,7 @@ def generate_dummy_data(date_str):
             'low': 848000.0,
             'volume': 2000000,
             'market': 'KOSPI',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -241,6 +197,7 @@ def generate_dummy_data(date_str):
             'low': 217500.0,
             'volume': 5000000,
             'market': 'KOSPI',
+            'type': 'stock',
             'date': date_str
         },
         # KOSDAQ 종목들
@@ -255,6 +212,7 @@ def generate_dummy_data(date_str):
             'low': 176500.0,
             'volume': 4000000,
             'market': 'KOSDAQ',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -268,6 +226,7 @@ def generate_dummy_data(date_str):
             'low': 538000.0,
             'volume': 2500000,
             'market': 'KOSDAQ',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -281,6 +240,7 @@ def generate_dummy_data(date_str):
             'low': 249000.0,
             'volume': 6000000,
             'market': 'KOSDAQ',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -294,6 +254,7 @@ def generate_dummy_data(date_str):
             'low': 118500.0,
             'volume': 8000000,
             'market': 'KOSDAQ',
+            'type': 'stock',
             'date': date_str
         },
         {
@@ -307,15 +268,16 @@ def generate_dummy_data(date_str):
             'low': 443000.0,
             'volume': 3500000,
             'market': 'KOSDAQ',
+            'type': 'stock',
             'date': date_str
         }
     ]
     
     logger.info(f"✅ 더미 데이터 생성 완료: {date_str} (총 {len(dummy_data)}개)")
-    return dummy_data
+    return pd.DataFrame(dummy_data, columns=KR_COLUMNS)
 
-def parse_market_data(data_list):
-    """시장 데이터 파싱"""
+def parse_market_data(frame):
+    """시장 데이터 파싱 (시장별 그룹 집계)"""
     market_data = {
         'timestamp': datetime.now().isoformat(),
         'kospi': {
@@ -330,48 +292,28 @@ def parse_market_data(data_list):
     }
     
     try:
-        if not data_list:
+        if frame is None or frame.empty:
             logger.warning("⚠️ 수집된 데이터가 없습니다.")
             return market_data
         
-        for data in data_list:
-            try:
-                if data.get('name') == 'KOSPI':
-                    market_data['kospi']['index'] = {
-                        'close': data.get('close', 0),
-                        'change_pct': data.get('change_pct', 0),
-                        'volume': data.get('volume', 0)
-                    }
-                elif data.get('name') == 'KOSDAQ':
-                    market_data['kosdaq']['index'] = {
-                        'close': data.get('close', 0),
-                        'change_pct': data.get('change_pct', 0),
-                        'volume': data.get('volume', 0)
-                    }
-                elif data.get('market') == 'KOSPI':
-                    stock_info = {
-                        'name': data.get('name', ''),
-                        'code': data.get('symbol', ''),
-                        'close': data.get('close', 0),
-                        'change': data.get('change', 0),
-                        'change_pct': data.get('change_pct', 0),
-                        'volume': data.get('volume', 0)
-                    }
-                    market_data['kospi']['stocks'].append(stock_info)
-                elif data.get('market') == 'KOSDAQ':
-                    stock_info = {
-                        'name': data.get('name', ''),
-                        'code': data.get('symbol', ''),
-                        'close': data.get('close', 0),
-                        'change': data.get('change', 0),
-                        'change_pct': data.get('change_pct', 0),
-                        'volume': data.get('volume', 0)
-                    }
-                    market_data['kosdaq']['stocks'].append(stock_info)
-                    
-            except (ValueError, TypeError) as e:
-                logger.warning(f"⚠️ 데이터 파싱 오류: {e}")
+        stock_columns = ['name', 'code', 'close', 'change', 'change_pct', 'volume']
+        
+        for market, group in frame.groupby('market', sort=False):
+            key = str(market).lower()
+            if key not in market_data:
                 continue
+            
+            indices = group[group['type'] == 'index']
+            if not indices.empty:
+                index_row = indices.iloc[0]
+                market_data[key]['index'] = {
+                    'close': float(index_row['close']),
+                    'change_pct': float(index_row['change_pct']),
+                    'volume': int(index_row['volume'])
+                }
+            
+            stocks = group[group['type'] == 'stock'].rename(columns={'symbol': 'code'})
+            market_data[key]['stocks'] = stocks[stock_columns].to_dict('records')
         
         # 요약 정보 생성
         if market_data['kospi']['index'] and market_data['kosdaq']['index']:
@@ -390,6 +332,22 @@ def parse_market_data(data_list):
     
     return market_data
 
+def add_recap(market_data, frame, session_date):
+    """주간 리캡용 최근 1주 등락률 추가 (지수/종목)"""
+    changes = period_changes(frame['symbol'].tolist(), session_date).round(2).dropna()
+    for market, group in frame.groupby('market', sort=False):
+        key = str(market).lower()
+        if key not in market_data:
+            continue
+        for row in group[group['type'] == 'index'].itertuples():
+            if row.symbol in changes and market_data[key]['index']:
+                market_data[key]['index']['weekly_change_pct'] = float(changes[row.symbol])
+        for stock in market_data[key]['stocks']:
+            if stock['code'] in changes:
+                stock['weekly_change_pct'] = float(changes[stock['code']])
+    market_data['recap'] = True
+    return market_data
+
 def save_data(data, date_str):
     """데이터를 JSON 파일로 저장"""
     os.makedirs(f'data/{date_str}', exist_ok=True)
@@ -401,6 +359,20 @@ def save_data(data, date_str):
     logger.info(f"💾 데이터 저장: {filepath}")
     return filepath
 
+def run_live(date_str):
+    """장중 폴링 모드: 시세가 바뀔 때마다 raw_kr.json을 최신 값으로 다시 씀 (휴장일이면 요청하지 않음)"""
+    if not is_trading_today('krx'):
+        logger.info("📅 한국 시장 휴장일: 실시간 폴링을 건너뜁니다")
+        return None
+    
+    table = load_symbol_table()
+    
+    def on_update(latest, changed):
+        save_data(parse_market_data(build_kr_frame(table, latest, date_str)), date_str)
+    
+    poll(table.index.tolist(), 'krx', f'data/{date_str}/live_kr.jsonl', on_update)
+    return f'data/{date_str}/raw_kr.json'
+
 def main():
     """메인 실행 함수"""
     logger.info("🇰🇷 한국 시장 종가 데이터 수집 시작")
@@ -408,11 +380,24 @@ def main():
     # 오늘 날짜
     today = datetime.now().strftime('%Y-%m-%d')
     
+    # 장중 폴링 모드
+    if '--live' in sys.argv[1:]:
+        return run_live(today)
+    
+    # 휴장일이면 수집을 건너뛰거나 직전 세션 데이터를 로컬 이력에서 재사용
+    plan = plan_session('afternoon')
+    if plan['action'] == 'skip':
+        logger.info("📅 한국 시장 휴장일: 수집을 건너뜁니다")
+        return None
+    
     # 데이터 수집
-    data_list = fetch_kr_data(today)
+    frame = fetch_kr_data(plan['last_session'].isoformat(), update=plan['action'] == 'run')
     
     # 데이터 파싱
-    parsed_data = parse_market_data(data_list)
+    parsed_data = parse_market_data(frame)
+    parsed_data['session_date'] = plan['last_session'].isoformat()
+    if plan['action'] == 'recap':
+        add_recap(parsed_data, frame, plan['last_session'])
     
     # 데이터 저장
     filepath = save_data(parsed_data, today)
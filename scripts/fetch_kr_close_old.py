@@ -5,12 +5,16 @@ KRX CSV에서 KOSPI, KOSDAQ 종가, 외국인/기관 수급, 업종별 등락률
 """
 
 import pandas as pd
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 import logging
 from dotenv import load_dotenv
+from http_cache import cached_get
+from market_calendar import plan_session
+from fetch_executor import run_tasks
+from data_go_kr import fetch_items, fetch_all_pages, iter_items, find_item, has_items, DataGoKrError, CHUNK_SIZE, USE_ASYNC, BULK_PAGE_SIZE
+from quota_ledger import remaining
 
 # 환경변수 로드
 load_dotenv()
@@ -19,6 +23,22 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 주식시세 API URL
+STOCK_API_URL = "https://apis.data.go.kr/1160100/service/GetStockSecuritiesInfoService/getStockPriceInfo"
+
+# 전체 시장 일괄 조회 모드 (종목별 요청 대신 basDt 전체 목록을 페이지 단위로 수집)
+USE_BULK = os.getenv('DATA_GO_KR_BULK', 'true').lower() == 'true'
+
+# 전체 시장 상장 종목 수 추정치 (쿼터 부족 시 페이지 크기 계산용)
+LISTING_ROWS_ESTIMATE = 3000
+
+# basDt별 전체 시장 색인 (프로세스 내 재사용)
+_listing_cache = {}
+
+# 주요 종목들
+KOSPI_STOCKS = ['삼성전자', 'SK하이닉스', 'LG에너지솔루션', '삼성바이오로직스', 'NAVER']
+KOSDAQ_STOCKS = ['셀트리온', 'LG화학', '현대차', '기아', 'POSCO홀딩스']
+
 def fetch_krx_data(date_str):
     """한국 금융위 API에서 일별 시세 데이터 수집"""
     try:
@@ -28,150 +48,147 @@ def fetch_krx_data(date_str):
             logger.error("❌ 한국 금융위 API 키가 설정되지 않았습니다.")
             return None
         
-        # API 키가 유효한지 확인 (간단한 테스트)
-        test_url = "https://apis.data.go.kr/1160100/service/GetStockSecuritiesInfoService/getStockPriceInfo"
-        test_params = {
-            'serviceKey': api_key,
-            'numOfRows': 1,
-            'pageNo': 1,
-            'resultType': 'xml',
-            'basDt': date_str.replace('-', ''),
-            'itmsNm': '삼성전자'
-        }
-        
-        try:
-            test_response = requests.get(test_url, params=test_params, timeout=10)
-            if test_response.status_code == 200:
-                test_data = test_response.text
-                if 'SERVICE_KEY_IS_NOT_REGISTERED_ERROR' in test_data:
-                    logger.warning("⚠️ API 키가 등록되지 않았습니다. 더미 데이터를 사용합니다.")
-                    return generate_dummy_data(date_str)
-                elif 'response' in test_data:
-                    logger.info("✅ API 키가 유효합니다. 실제 데이터를 수집합니다.")
-                    return fetch_real_data(date_str, api_key)
-                else:
-                    logger.warning("⚠️ API 응답 형식이 예상과 다릅니다. 더미 데이터를 사용합니다.")
-                    return generate_dummy_data(date_str)
-            else:
-                logger.warning(f"⚠️ API 테스트 실패: {test_response.status_code}. 더미 데이터를 사용합니다.")
-                return generate_dummy_data(date_str)
-        except Exception as e:
-            logger.warning(f"⚠️ API 테스트 중 오류: {e}. 더미 데이터를 사용합니다.")
+        # 별도 테스트 요청 없이 바로 수집하고, 키/서비스 오류는 응답 코드로 판별
+        stock_data_list = fetch_real_data(date_str, api_key)
+        if not stock_data_list:
+            logger.warning("⚠️ 수집된 종목이 없습니다. 더미 데이터를 사용합니다.")
             return generate_dummy_data(date_str)
+        return stock_data_list
         
+    except DataGoKrError as e:
+        if 'SERVICE_KEY_IS_NOT_REGISTERED_ERROR' in (e.message or ''):
+            logger.warning("⚠️ API 키가 등록되지 않았습니다. 더미 데이터를 사용합니다.")
+        else:
+            logger.warning(f"⚠️ API 서비스 오류: {e}. 더미 데이터를 사용합니다.")
+        return generate_dummy_data(date_str)
     except Exception as e:
         logger.error(f"❌ 한국 금융위 API 데이터 수집 실패: {e}")
         return generate_dummy_data(date_str)
 
-def fetch_real_data(date_str, api_key):
-    """실제 API 데이터 수집"""
-    url = "https://apis.data.go.kr/1160100/service/GetStockSecuritiesInfoService/getStockPriceInfo"
-    
-    # 주요 종목들
-    kospi_stocks = ['삼성전자', 'SK하이닉스', 'LG에너지솔루션', '삼성바이오로직스', 'NAVER']
-    kosdaq_stocks = ['셀트리온', 'LG화학', '현대차', '기아', 'POSCO홀딩스']
-    
-    all_data = []
+def build_stock_params(stock, date_str, api_key):
+    """종목 조회 요청 파라미터 생성"""
+    return {
+        'serviceKey': api_key,
+        'numOfRows': 1,
+        'pageNo': 1,
+        'resultType': 'xml',
+        'basDt': date_str.replace('-', ''),
+        'itmsNm': stock
+    }
+
+def parse_stock_response(stock, market, items):
+    """종목 조회 item 레코드를 수집 형식으로 변환 (실패 시 None)"""
+    item = find_item(items, 'itmsNm', stock)
+    if not item:
+        logger.warning(f"⚠️ {stock} 데이터 없음")
+        return None
     
-    # KOSPI 대표주 데이터 수집
-    for stock in kospi_stocks:
-        params = {
-            'serviceKey': api_key,
-            'numOfRows': 1,
-            'pageNo': 1,
-            'resultType': 'xml',
-            'basDt': date_str.replace('-', ''),
-            'itmsNm': stock
-        }
+    stock_data = {
+        'itmsNm': item.get('itmsNm'),  # 종목명
+        'srtnCd': item.get('srtnCd'),  # 종목코드
+        'clpr': item.get('clpr'),      # 종가
+        'vs': item.get('vs'),          # 전일대비
+        'fltRt': item.get('fltRt'),    # 등락률
+        'oprc': item.get('mkp'),       # 시가
+        'hgpr': item.get('hipr'),      # 고가
+        'lwpr': item.get('lopr'),      # 저가
+        'trqu': item.get('trqu'),      # 거래량
+        'trPrc': item.get('trPrc'),    # 거래대금
+        'mrktTotAmt': item.get('mrktTotAmt'),  # 시가총액
+        'market': market
+    }
+    logger.info(f"✅ {stock} 데이터 수집 완료")
+    return stock_data
+
+def fetch_single_stock(stock, market, date_str, api_key):
+    """종목 1건 요청 및 파싱 (실패 시 None)"""
+    params = build_stock_params(stock, date_str, api_key)
+    with cached_get(STOCK_API_URL, params=params, timeout=10, validate=has_items) as response:
+        if response.status_code != 200:
+            logger.warning(f"⚠️ {stock} 요청 실패: {response.status_code}")
+            return None
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                # XML 응답 파싱
-                response_text = response.text
-                if 'NORMAL SERVICE' in response_text:
-                    # XML 데이터 파싱
-                    lines = response_text.strip().split('\n')
-                    if len(lines) >= 2:
-                        data_line = lines[1].strip()
-                        fields = data_line.split()
-                        if len(fields) >= 15:
-                            stock_data = {
-                                'itmsNm': fields[4],  # 종목명
-                                'srtnCd': fields[3],  # 종목코드
-                                'clpr': fields[5],    # 종가
-                                'vs': fields[6],      # 전일대비
-                                'fltRt': fields[7],   # 등락률
-                                'oprc': fields[8],    # 시가
-                                'hgpr': fields[9],    # 고가
-                                'lwpr': fields[10],   # 저가
-                                'trqu': fields[11],   # 거래량
-                                'trPrc': fields[12],  # 거래대금
-                                'mrktTotAmt': fields[13],  # 시가총액
-                                'market': 'KOSPI'
-                            }
-                            all_data.append(stock_data)
-                            logger.info(f"✅ {stock} 데이터 수집 완료")
-                        else:
-                            logger.warning(f"⚠️ {stock} 데이터 형식 오류")
-                    else:
-                        logger.warning(f"⚠️ {stock} 데이터 없음")
-                else:
-                    logger.warning(f"⚠️ {stock} 서비스 오류")
-            else:
-                logger.warning(f"⚠️ {stock} 요청 실패: {response.status_code}")
-        except Exception as e:
-            logger.warning(f"⚠️ {stock} 수집 중 오류: {e}")
+            items = list(iter_items(response.iter_content(CHUNK_SIZE)))
+        except DataGoKrError as e:
+            logger.warning(f"⚠️ {stock} 서비스 오류: {e}")
+            return None
     
-    # KOSDAQ 대표주 데이터 수집
-    for stock in kosdaq_stocks:
-        params = {
-            'serviceKey': api_key,
-            'numOfRows': 1,
-            'pageNo': 1,
-            'resultType': 'xml',
-            'basDt': date_str.replace('-', ''),
-            'itmsNm': stock
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                # XML 응답 파싱
-                response_text = response.text
-                if 'NORMAL SERVICE' in response_text:
-                    # XML 데이터 파싱
-                    lines = response_text.strip().split('\n')
-                    if len(lines) >= 2:
-                        data_line = lines[1].strip()
-                        fields = data_line.split()
-                        if len(fields) >= 15:
-                            stock_data = {
-                                'itmsNm': fields[4],  # 종목명
-                                'srtnCd': fields[3],  # 종목코드
-                                'clpr': fields[5],    # 종가
-                                'vs': fields[6],      # 전일대비
-                                'fltRt': fields[7],   # 등락률
-                                'oprc': fields[8],    # 시가
-                                'hgpr': fields[9],    # 고가
-                                'lwpr': fields[10],   # 저가
-                                'trqu': fields[11],   # 거래량
-                                'trPrc': fields[12],  # 거래대금
-                                'mrktTotAmt': fields[13],  # 시가총액
-                                'market': 'KOSDAQ'
-                            }
-                            all_data.append(stock_data)
-                            logger.info(f"✅ {stock} 데이터 수집 완료")
-                        else:
-                            logger.warning(f"⚠️ {stock} 데이터 형식 오류")
-                    else:
-                        logger.warning(f"⚠️ {stock} 데이터 없음")
-                else:
-                    logger.warning(f"⚠️ {stock} 서비스 오류")
-            else:
-                logger.warning(f"⚠️ {stock} 요청 실패: {response.status_code}")
-        except Exception as e:
-            logger.warning(f"⚠️ {stock} 수집 중 오류: {e}")
+    return parse_stock_response(stock, market, items)
+
+def fetch_stocks_async(targets, date_str, api_key):
+    """종목 조회를 하나의 비동기 세션에서 동시에 요청"""
+    params_list = [build_stock_params(stock, date_str, api_key) for stock, _ in targets]
+    results = fetch_items(STOCK_API_URL, params_list, labels=[stock for stock, _ in targets])
+    return [
+        parse_stock_response(stock, market, items) if items is not None else None
+        for (stock, market), items in zip(targets, results)
+    ]
+
+def fetch_market_listing(date_str, api_key, page_size=BULK_PAGE_SIZE):
+    """basDt 전체 상장 종목을 수집해 단축코드/종목명 색인 생성"""
+    bas_dt = date_str.replace('-', '')
+    if bas_dt in _listing_cache:
+        return _listing_cache[bas_dt]
+    
+    params = {
+        'serviceKey': api_key,
+        'resultType': 'xml',
+        'basDt': bas_dt
+    }
+    items = fetch_all_pages(STOCK_API_URL, params, page_size=page_size)
+    
+    listing = {
+        'by_code': {item.get('srtnCd'): item for item in items if item.get('srtnCd')},
+        'by_name': {item.get('itmsNm'): item for item in items if item.get('itmsNm')}
+    }
+    _listing_cache[bas_dt] = listing
+    logger.info(f"📋 전체 시장 색인 생성: {bas_dt} ({len(listing['by_code'])}개 종목)")
+    return listing
+
+def lookup_stock(listing, key):
+    """단축코드 또는 종목명으로 색인 조회 (없으면 None)"""
+    return listing['by_code'].get(key) or listing['by_name'].get(key)
+
+def fetch_real_data(date_str, api_key, use_async=USE_ASYNC, use_bulk=USE_BULK):
+    """실제 API 데이터 수집"""
+    targets = [(stock, 'KOSPI') for stock in KOSPI_STOCKS] + [(stock, 'KOSDAQ') for stock in KOSDAQ_STOCKS]
+    
+    # 남은 일일 쿼터에 맞춰 요청 수를 줄임 (종목별 → 일괄 조회, 페이지 크기 확대)
+    page_size = BULK_PAGE_SIZE
+    left = remaining('data.go.kr')
+    if left is not None:
+        if left == 0:
+            logger.warning("⚠️ data.go.kr 일일 쿼터 소진. 요청하지 않습니다.")
+            return []
+        if not use_bulk and left < len(targets):
+            logger.warning(f"⚠️ data.go.kr 남은 쿼터 {left}회: 종목별 요청 대신 일괄 조회로 전환")
+            use_bulk = True
+        if use_bulk and left * page_size < LISTING_ROWS_ESTIMATE:
+            page_size = -(-LISTING_ROWS_ESTIMATE // left)
+            logger.warning(f"⚠️ data.go.kr 남은 쿼터 {left}회: 페이지 크기 {page_size}행으로 확대")
+    
+    if use_bulk:
+        listing = fetch_market_listing(date_str, api_key, page_size)
+        results = []
+        for stock, market in targets:
+            item = lookup_stock(listing, stock)
+            if not item:
+                logger.warning(f"⚠️ {stock} 데이터 없음")
+                results.append(None)
+                continue
+            results.append(parse_stock_response(stock, market, [item]))
+    elif use_async:
+        results = fetch_stocks_async(targets, date_str, api_key)
+    else:
+        # 종목별 요청을 병렬 실행 (KOSPI → KOSDAQ 순서 유지)
+        results = run_tasks(
+            'data.go.kr',
+            lambda target: fetch_single_stock(target[0], target[1], date_str, api_key),
+            targets,
+            describe=lambda target: target[0]
+        )
+    all_data = [result for result in results if result]
     
     logger.info(f"✅ 실제 API 데이터 수집 완료: {date_str} (총 {len(all_data)}개 종목)")
     return all_data
@@ -324,8 +341,14 @@ def main():
     # 오늘 날짜
     today = datetime.now().strftime('%Y-%m-%d')
     
+    # 휴장일이면 건너뛰거나 직전 개장일 기준으로 조회
+    plan = plan_session('afternoon')
+    if plan['action'] == 'skip':
+        logger.info("📅 한국 시장 휴장일: 수집을 건너뜁니다")
+        return None
+    
     # 한국 금융위 API 데이터 수집
-    stock_data_list = fetch_krx_data(today)
+    stock_data_list = fetch_krx_data(plan['last_session'].isoformat())
     
     # 데이터 파싱
     market_data = parse_market_data(stock_data_list)
@@ -4,12 +4,16 @@
 한국 금융위 API에서 KOSPI, KOSDAQ 등 주요 지수 데이터 수집
 """
 
-import requests
 import json
 import os
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
+from http_cache import cached_get
+from market_calendar import plan_session
+from quota_ledger import can_afford
+from fetch_executor import run_tasks
+from data_go_kr import fetch_items, iter_items, find_item, has_items, DataGoKrError, CHUNK_SIZE, USE_ASYNC
 
 # 환경변수 로드
 load_dotenv()
@@ -18,7 +22,75 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_index_data(date_str):
+# 지수 API URL
+INDEX_API_URL = "https://apis.data.go.kr/1160100/service/GetMarketIndexInfoService/getMarketIndexInfo"
+
+# 수집할 지수들
+INDICES = ['KOSPI', 'KOSDAQ', 'KOSPI200']
+
+def build_index_params(index_name, date_str, api_key):
+    """지수 조회 요청 파라미터 생성"""
+    return {
+        'serviceKey': api_key,
+        'numOfRows': 1,
+        'pageNo': 1,
+        'resultType': 'xml',
+        'basDt': date_str.replace('-', ''),
+        'idxNm': index_name
+    }
+
+def parse_index_response(index_name, items):
+    """지수 조회 item 레코드를 수집 형식으로 변환 (실패 시 None)"""
+    item = find_item(items, 'idxNm', index_name)
+    if not item:
+        logger.warning(f"⚠️ {index_name} 데이터 없음")
+        return None
+    
+    index_data = {
+        'idxNm': item.get('idxNm'),   # 지수명
+        'clpr': item.get('clpr'),     # 종가
+        'vs': item.get('vs'),         # 전일대비
+        'fltRt': item.get('fltRt'),   # 등락률
+        'oprc': item.get('mkp'),      # 시가
+        'hgpr': item.get('hipr'),     # 고가
+        'lwpr': item.get('lopr'),     # 저가
+        'trqu': item.get('trqu'),     # 거래량
+        'basDt': item.get('basDt')    # 기준일자
+    }
+    logger.info(f"✅ {index_name} 지수 데이터 수집 완료")
+    return index_data
+
+def fetch_single_index(index_name, date_str, api_key, offline=False):
+    """지수 1건 요청 및 파싱 (실패 시 None, offline이면 캐시 응답만 사용)"""
+    params = build_index_params(index_name, date_str, api_key)
+    response = cached_get(INDEX_API_URL, params=params, timeout=10, offline=offline, validate=has_items)
+    if response is None:
+        logger.warning(f"⚠️ {index_name} 캐시 응답 없음")
+        return None
+    
+    with response:
+        if response.status_code != 200:
+            logger.warning(f"⚠️ {index_name} 요청 실패: {response.status_code}")
+            return None
+        
+        try:
+            items = list(iter_items(response.iter_content(CHUNK_SIZE)))
+        except DataGoKrError as e:
+            logger.warning(f"⚠️ {index_name} 서비스 오류: {e}")
+            return None
+    
+    return parse_index_response(index_name, items)
+
+def fetch_indices_async(date_str, api_key):
+    """지수 조회를 하나의 비동기 세션에서 동시에 요청"""
+    params_list = [build_index_params(index_name, date_str, api_key) for index_name in INDICES]
+    results = fetch_items(INDEX_API_URL, params_list, labels=INDICES)
+    return [
+        parse_index_response(index_name, items) if items is not None else None
+        for index_name, items in zip(INDICES, results)
+    ]
+
+def fetch_index_data(date_str, use_async=USE_ASYNC):
     """한국 지수 API에서 지수 데이터 수집"""
     try:
         # API 키 확인
@@ -27,59 +99,19 @@ def fetch_index_data(date_str):
             logger.error("❌ 한국 금융위 API 키가 설정되지 않았습니다.")
             return None
         
-        # 지수 API URL
-        url = "https://apis.data.go.kr/1160100/service/GetMarketIndexInfoService/getMarketIndexInfo"
+        # 쿼터가 부족하면 요청 없이 캐시 응답만 사용
+        offline = not can_afford('data.go.kr', len(INDICES))
         
-        # 수집할 지수들
-        indices = ['KOSPI', 'KOSDAQ', 'KOSPI200']
-        
-        all_data = []
-        
-        for index_name in indices:
-            params = {
-                'serviceKey': api_key,
-                'numOfRows': 1,
-                'pageNo': 1,
-                'resultType': 'xml',
-                'basDt': date_str.replace('-', ''),
-                'idxNm': index_name
-            }
-            
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    # XML 응답 파싱
-                    response_text = response.text
-                    if 'NORMAL SERVICE' in response_text:
-                        # XML 데이터 파싱
-                        lines = response_text.strip().split('\n')
-                        if len(lines) >= 2:
-                            data_line = lines[1].strip()
-                            fields = data_line.split()
-                            if len(fields) >= 10:
-                                index_data = {
-                                    'idxNm': fields[3],  # 지수명
-                                    'clpr': fields[4],   # 종가
-                                    'vs': fields[5],     # 전일대비
-                                    'fltRt': fields[6],  # 등락률
-                                    'oprc': fields[7],   # 시가
-                                    'hgpr': fields[8],   # 고가
-                                    'lwpr': fields[9],   # 저가
-                                    'trqu': fields[10],  # 거래량
-                                    'basDt': fields[2]   # 기준일자
-                                }
-                                all_data.append(index_data)
-                                logger.info(f"✅ {index_name} 지수 데이터 수집 완료")
-                            else:
-                                logger.warning(f"⚠️ {index_name} 데이터 형식 오류")
-                        else:
-                            logger.warning(f"⚠️ {index_name} 데이터 없음")
-                    else:
-                        logger.warning(f"⚠️ {index_name} 서비스 오류")
-                else:
-                    logger.warning(f"⚠️ {index_name} 요청 실패: {response.status_code}")
-            except Exception as e:
-                logger.warning(f"⚠️ {index_name} 수집 중 오류: {e}")
+        if use_async and not offline:
+            results = fetch_indices_async(date_str, api_key)
+        else:
+            # 지수별 요청을 병렬 실행 (입력 순서 유지)
+            results = run_tasks(
+                'data.go.kr',
+                lambda index_name: fetch_single_index(index_name, date_str, api_key, offline),
+                INDICES
+            )
+        all_data = [result for result in results if result]
         
         if not all_data:
             logger.warning("⚠️ 지수 데이터 수집 실패. 더미 데이터를 사용합니다.")
@@ -210,8 +242,14 @@ def main():
     # 오늘 날짜
     today = datetime.now().strftime('%Y-%m-%d')
     
+    # 휴장일이면 건너뛰거나 직전 개장일 기준으로 조회
+    plan = plan_session('afternoon')
+    if plan['action'] == 'skip':
+        logger.info("📅 한국 시장 휴장일: 수집을 건너뜁니다")
+        return None
+    
     # 지수 데이터 수집
-    index_data_list = fetch_index_data(today)
+    index_data_list = fetch_index_data(plan['last_session'].isoformat())
     
     # 데이터 파싱
     parsed_data = parse_index_data(index_data_list)
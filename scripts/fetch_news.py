@@ -2,14 +2,25 @@
 """
 뉴스 데이터 수집 스크립트
 NewsAPI에서 금융 관련 뉴스 수집
+
+사용법:
+    python scripts/fetch_news.py            # 비즈니스 헤드라인 상위 5개 (clean_news.json)
+    python scripts/fetch_news.py --ingest   # 여러 쿼리/카테고리 페이지 수집 → news.jsonl 누적
 """
 
-import requests
+import re
+import sys
 import json
 import os
+import hashlib
+import threading
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
+from http_cache import cached_get
+from quota_ledger import can_afford, affordable
+from fetch_executor import run_tasks
+from urls import canonical_url
 
 # 환경변수 로드
 load_dotenv()
@@ -18,6 +29,154 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# NewsAPI 엔드포인트
+TOP_HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
+EVERYTHING_URL = "https://newsapi.org/v2/everything"
+
+# 수집 모드 쿼리 (엔드포인트, 파라미터)
+INGEST_QUERIES = [
+    (TOP_HEADLINES_URL, {'country': 'us', 'category': 'business'}),
+    (TOP_HEADLINES_URL, {'country': 'us', 'category': 'technology'}),
+    (EVERYTHING_URL, {'q': 'KOSPI OR KOSDAQ OR "Korean stocks" OR "Bank of Korea"', 'language': 'en', 'sortBy': 'publishedAt'}),
+    # /v2/everything의 language는 ko를 지원하지 않으므로 한국어 쿼리는 언어 필터 없이 검색
+    (EVERYTHING_URL, {'q': '코스피 OR 코스닥 OR 증시', 'sortBy': 'publishedAt'}),
+    (EVERYTHING_URL, {'q': 'FOMC OR "Federal Reserve" OR "S&P 500" OR Nasdaq', 'language': 'en', 'sortBy': 'publishedAt'}),
+    (EVERYTHING_URL, {'q': 'NVIDIA OR Tesla OR Apple OR Bitcoin', 'language': 'en', 'sortBy': 'publishedAt'})
+]
+
+# 쿼리당 페이지 크기 / 최대 페이지 수
+INGEST_PAGE_SIZE = 50
+INGEST_MAX_PAGES = 2
+
+class NewsSink:
+    """수집 중인 기사를 정규 URL/제목 해시로 중복 제거하며 JSONL에 이어 쓰는 저장소
+
+    같은 파일에 이미 있는 기사의 키를 먼저 읽어 두므로 여러 번 실행해도 중복이 쌓이지 않는다.
+    여러 수집 스레드에서 동시에 add를 호출해도 안전하다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.seen_urls = set()
+        self.seen_titles = set()
+        self.written = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.seen_urls.add(record.get('canonical_url'))
+                    self.seen_titles.add(record.get('title_hash'))
+
+    def add(self, records):
+        """새 기사만 파일에 추가하고 추가한 수 반환"""
+        added = 0
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    if record['canonical_url'] in self.seen_urls or record['title_hash'] in self.seen_titles:
+                        self.duplicates += 1
+                        continue
+                    self.seen_urls.add(record['canonical_url'])
+                    self.seen_titles.add(record['title_hash'])
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    added += 1
+            self.written += added
+        return added
+
+def title_hash(title, source=''):
+    """비교용 제목 해시 (끝의 ' - 매체명' 제거, 소문자, 기호/공백 정리)"""
+    title = (title or '').strip()
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    normalized = re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', title.lower())).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def to_news_record(article, label):
+    """NewsAPI 기사를 저장 형식으로 변환 (제목/URL이 없거나 삭제된 기사는 None)"""
+    title = article.get('title') or ''
+    url = article.get('url') or ''
+    if not title or not url or title == '[Removed]':
+        return None
+    source = (article.get('source') or {}).get('name', '')
+    return {
+        'title': title,
+        'description': article.get('description') or '',
+        'content': article.get('content') or '',
+        'url': url,
+        'publishedAt': article.get('publishedAt', ''),
+        'source': source,
+        'query': label,
+        'canonical_url': canonical_url(url),
+        'title_hash': title_hash(title, source),
+        'fetched_at': datetime.now().isoformat()
+    }
+
+def describe_query(query):
+    """쿼리 로그용 이름"""
+    url, params = query
+    return params.get('category') or params.get('q', url)
+
+def fetch_query_pages(query, api_key, sink, max_pages):
+    """쿼리 1개를 페이지 순서대로 수집해 sink에 바로 추가, 추가한 기사 수 반환"""
+    url, params = query
+    label = describe_query(query)
+    added = 0
+    
+    for page in range(1, max_pages + 1):
+        response = cached_get(url, params=dict(params, apiKey=api_key, pageSize=INGEST_PAGE_SIZE, page=page), timeout=10)
+        if response.status_code != 200:
+            logger.warning(f"⚠️ NewsAPI '{label}' {page}페이지 요청 실패: {response.status_code}")
+            break
+        
+        data = response.json()
+        articles = data.get('articles', [])
+        added += sink.add(record for record in (to_news_record(article, label) for article in articles) if record)
+        
+        # 마지막 페이지면 중단
+        if len(articles) < INGEST_PAGE_SIZE or page * INGEST_PAGE_SIZE >= data.get('totalResults', 0):
+            break
+    
+    return added
+
+def ingest_news(date_str, queries=INGEST_QUERIES, max_pages=INGEST_MAX_PAGES):
+    """여러 쿼리를 병렬로 페이지 수집해 data/{날짜}/news.jsonl에 중복 없이 누적"""
+    api_key = os.getenv('NEWS_API_KEY')
+    if not api_key:
+        logger.warning("⚠️ NewsAPI 키가 설정되지 않았습니다. 수집을 건너뜁니다.")
+        return None
+    
+    # 남은 일일 쿼터에 맞춰 쿼리당 페이지 수를 줄임
+    budget = affordable('newsapi', len(queries) * max_pages)
+    if budget == 0:
+        logger.warning("⚠️ NewsAPI 쿼터 소진. 수집을 건너뜁니다.")
+        return None
+    if budget < len(queries) * max_pages:
+        if budget >= len(queries):
+            max_pages = budget // len(queries)
+        else:
+            queries, max_pages = queries[:budget], 1
+        logger.warning(f"⚠️ NewsAPI 쿼터 부족: 쿼리 {len(queries)}개 × {max_pages}페이지로 축소")
+    
+    os.makedirs(f'data/{date_str}', exist_ok=True)
+    filepath = f'data/{date_str}/news.jsonl'
+    sink = NewsSink(filepath)
+    
+    run_tasks(
+        'newsapi',
+        lambda query: fetch_query_pages(query, api_key, sink, max_pages),
+        queries,
+        describe=describe_query
+    )
+    
+    logger.info(f"✅ 뉴스 수집 완료: 신규 {sink.written}개, 중복 {sink.duplicates}개 제외 → {filepath}")
+    return filepath
+
 def fetch_news_data():
     """뉴스 데이터 수집"""
     try:
@@ -37,7 +196,11 @@ def fetch_news_data():
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            # 쿼터가 남지 않았으면 요청 없이 마지막 캐시 응답 재사용
+            response = cached_get(url, params=params, timeout=10, offline=not can_afford('newsapi'))
+            if response is None:
+                logger.warning("⚠️ NewsAPI 쿼터 소진, 재사용할 캐시도 없습니다. 더미 데이터를 사용합니다.")
+                return generate_dummy_news_data()
             if response.status_code == 200:
                 data = response.json()
                 articles = data.get('articles', [])
@@ -134,6 +297,10 @@ def main():
     # 오늘 날짜
     today = datetime.now().strftime('%Y-%m-%d')
     
+    # 다중 쿼리 수집 모드
+    if '--ingest' in sys.argv[1:]:
+        return ingest_news(today)
+    
     # 뉴스 데이터 수집
     news_data = fetch_news_data()
     
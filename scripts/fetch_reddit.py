@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Reddit 금융 게시물 수집 스크립트
-키워드 기반으로 Top/Day 게시물 수집
+키워드를 OR 쿼리로 묶어 멀티레딧에서 Top/Day 게시물 수집
+(증분 모드: 새 게시물만 수집해 24시간 창에 누적하고, 창 게시물의 업보트/댓글 수는 실행마다 일괄 갱신)
 """
 
 import praw
@@ -9,7 +10,12 @@ import json
 import os
 from datetime import datetime, timedelta
 import logging
+import threading
 from dotenv import load_dotenv
+from fetch_executor import run_tasks
+from reddit_async import search_many
+from quota_ledger import record, affordable
+from keyword_matcher import KEYWORDS, compile_keyword_matcher
 
 # 환경 변수 로드
 load_dotenv()
@@ -23,8 +29,31 @@ REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
 REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'InsightPipeline/1.0')
 
-# 검색할 키워드들
-KEYWORDS = ['S&P500', 'KOSPI', 'FOMC', 'AI', 'Bitcoin', 'Tesla', 'Apple', 'NVIDIA']
+# 검색할 서브레딧들
+SUBREDDITS = ['investing', 'stocks', 'wallstreetbets', 'cryptocurrency', 'economics']
+
+# 서브레딧 전체를 한 번에 검색하는 멀티레딧 (investing+stocks+...)
+MULTIREDDIT = '+'.join(SUBREDDITS)
+
+# OR 쿼리 1개의 최대 길이 (Reddit 검색어 한도 512자 이내)
+MAX_QUERY_LENGTH = 256
+
+# 쿼리당 검색 결과 수 (Reddit 한 페이지 최대치라 요청 1회)
+SEARCH_LIMIT = 100
+
+# 비동기 수집 모드 (OAuth API 직접 호출, 분당 요청 한도 내 동시 실행)
+USE_ASYNC = os.getenv('REDDIT_ASYNC', 'false').lower() == 'true'
+
+# 증분 수집 모드 (고수위선 이후 새 게시물만 수집해 누적 창에 병합)
+INCREMENTAL = os.getenv('REDDIT_INCREMENTAL', 'false').lower() == 'true'
+STATE_FILE = os.path.join(os.getenv('DATA_DIR', 'data'), 'state', 'reddit_incremental.json')
+WINDOW_HOURS = 24             # 누적 창 길이
+RECHECK_INTERVAL_MINUTES = 30  # 같은 조합 재검색 최소 간격
+REFRESH_BATCH_SIZE = 100       # /api/info 요청 1회에 조회할 게시물 수 (Reddit 최대치)
+MAX_NEW_PAGES = 10             # 'new' 검색에서 고수위선까지 넘겨 볼 최대 페이지 수 (Reddit 검색 결과 상한 1000개)
+
+# 병렬 검색 시 스레드별 클라이언트 저장소
+_thread_local = threading.local()
 
 def init_reddit():
     """Reddit 클라이언트 초기화"""
@@ -39,74 +68,285 @@ def init_reddit():
         logger.error(f"❌ Reddit 클라이언트 초기화 실패: {e}")
         return None
 
-def search_reddit_posts(reddit, keyword, limit=5):
-    """Reddit에서 키워드로 게시물 검색"""
+def calculate_post_score(score, num_comments, created_utc):
+    """스코어 계산 (업보트 + 댓글 수 + 시간 가중치)"""
+    hours_ago = (datetime.now() - datetime.fromtimestamp(created_utc)).total_seconds() / 3600
+    time_weight = max(0.1, 1 - (hours_ago / 24))  # 24시간 내 가중치
+    return (score + num_comments) * time_weight
+
+def quote_keyword(keyword):
+    """영숫자가 아닌 문자가 있는 키워드는 따옴표로 감쌈 (S&P500 → "S&P500")"""
+    return keyword if keyword.isalnum() else f'"{keyword}"'
+
+def plan_queries(keywords, max_length=MAX_QUERY_LENGTH):
+    """키워드를 max_length 이내의 OR 쿼리로 묶음 (쿼리 1개 = 요청 1회)"""
+    queries, current = [], []
+    for keyword in keywords:
+        candidate = ' OR '.join(quote_keyword(k) for k in current + [keyword])
+        if current and len(candidate) > max_length:
+            queries.append(' OR '.join(quote_keyword(k) for k in current))
+            current = []
+        current.append(keyword)
+    if current:
+        queries.append(' OR '.join(quote_keyword(k) for k in current))
+    return queries
+
+# 검색 키워드(keyword_matcher.KEYWORDS) 단어 단위 매처
+match_keywords = compile_keyword_matcher(KEYWORDS)
+
+def to_post_record(post, keywords):
+    """praw Submission을 저장 형식으로 변환"""
+    return {
+        'id': post.id,
+        'title': post.title,
+        'url': f"https://reddit.com{post.permalink}",
+        'subreddit': str(post.subreddit),
+        'score': post.score,
+        'num_comments': post.num_comments,
+        'created_utc': post.created_utc,
+        'author': str(post.author) if post.author else '[deleted]',
+        'selftext': post.selftext[:500] if post.selftext else '',
+        'calculated_score': calculate_post_score(post.score, post.num_comments, post.created_utc),
+        'keyword': keywords[0],
+        'keywords': keywords
+    }
+
+def tag_posts(submissions, sort='top', since_utc=0):
+    """검색 결과를 일치한 키워드로 태깅해 저장 형식으로 변환
+
+    sort='new'이면 since_utc 이하 게시물에서 중단한다. 로컬 매처에 걸리지 않는
+    게시물(검색 엔진의 어간 일치 등)은 버린다.
+    """
     posts = []
+    skipped = 0
     
-    try:
-        # 인기 서브레딧들에서 검색
-        subreddits = ['investing', 'stocks', 'wallstreetbets', 'cryptocurrency', 'economics']
-        
-        for subreddit_name in subreddits:
-            try:
-                subreddit = reddit.subreddit(subreddit_name)
-                
-                # Top 게시물 검색
-                top_posts = subreddit.search(keyword, sort='top', time_filter='day', limit=limit)
-                
-                for post in top_posts:
-                    # 스코어 계산 (업보트 + 댓글 수 + 시간 가중치)
-                    hours_ago = (datetime.now() - datetime.fromtimestamp(post.created_utc)).total_seconds() / 3600
-                    time_weight = max(0.1, 1 - (hours_ago / 24))  # 24시간 내 가중치
-                    score = (post.score + post.num_comments) * time_weight
-                    
-                    posts.append({
-                        'id': post.id,
-                        'title': post.title,
-                        'url': f"https://reddit.com{post.permalink}",
-                        'subreddit': subreddit_name,
-                        'score': post.score,
-                        'num_comments': post.num_comments,
-                        'created_utc': post.created_utc,
-                        'author': str(post.author) if post.author else '[deleted]',
-                        'selftext': post.selftext[:500] if post.selftext else '',
-                        'calculated_score': score,
-                        'keyword': keyword
-                    })
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ {subreddit_name} 검색 실패: {e}")
-                continue
-                
-    except Exception as e:
-        logger.error(f"❌ Reddit 검색 실패: {e}")
+    for post in submissions:
+        if sort == 'new' and post.created_utc <= since_utc:
+            break
+        keywords = match_keywords(f"{post.title}\n{post.selftext or ''}")
+        if not keywords:
+            skipped += 1
+            continue
+        posts.append(to_post_record(post, keywords))
     
+    if skipped:
+        logger.info(f"ℹ️ 키워드 불일치 게시물 {skipped}개 제외")
     return posts
 
+def needs_next_page(page, since_utc, limit=SEARCH_LIMIT):
+    """'new' 검색 페이지가 꽉 찼고 마지막 게시물이 아직 고수위선보다 새로우면 다음 페이지 필요"""
+    return len(page) >= limit and page[-1].created_utc > since_utc
+
+def search_query_posts(reddit, query, sort='top', since_utc=0, limit=SEARCH_LIMIT):
+    """멀티레딧에서 OR 쿼리로 검색하고 일치한 키워드로 태깅
+
+    sort='new'이면 since_utc 이하 게시물이 나올 때까지(최대 MAX_NEW_PAGES) after로 다음 페이지를 이어 받는다.
+    """
+    submissions = []
+    after = None
+    for _ in range(MAX_NEW_PAGES if sort == 'new' else 1):
+        page = list(reddit.subreddit(MULTIREDDIT).search(
+            query, sort=sort, time_filter='day', limit=limit, params={'after': after} if after else None
+        ))
+        record('reddit')  # limit ≤ 100이면 페이지당 요청 1회
+        submissions.extend(page)
+        if sort != 'new' or not needs_next_page(page, since_utc, limit):
+            break
+        after = f"t3_{page[-1].id}"
+    return tag_posts(submissions, sort, since_utc)
+
+def search_new_pages_async(targets, pages):
+    """비동기 'new' 검색의 다음 페이지들을 고수위선까지 이어 받아 pages에 덧붙임
+
+    중간 페이지가 실패한 쿼리는 None으로 바꿔 고수위선을 올리지 않게 한다 (빠진 구간은 다음 실행에서 다시 검색).
+    """
+    pending = [i for i, ((_, sort, since_utc), page) in enumerate(zip(targets, pages))
+               if sort == 'new' and page is not None and needs_next_page(page, since_utc)]
+    for _ in range(MAX_NEW_PAGES - 1):
+        pending = pending[:affordable('reddit', len(pending))]
+        if not pending:
+            break
+        more = search_many([
+            (MULTIREDDIT, targets[i][0], 'new', SEARCH_LIMIT, f"t3_{pages[i][-1].id}") for i in pending
+        ])
+        next_pending = []
+        for i, page in zip(pending, more):
+            if page is None:
+                pages[i] = None
+                continue
+            pages[i] = pages[i] + page
+            if needs_next_page(page, targets[i][2]):
+                next_pending.append(i)
+        pending = next_pending
+    return pages
+
+def run_searches(targets, use_async=USE_ASYNC):
+    """(쿼리, 정렬, since_utc) 목록을 병렬 검색하고 입력 순서대로 결과 반환 (실패는 None)
+
+    일부 쿼리가 실패해도 나머지 결과는 그대로 돌려준다. 남은 분당 한도보다 쿼리가 많으면
+    뒤쪽 쿼리는 요청하지 않고 None으로 둔다 (증분 모드에서는 다음 실행에서 다시 검색).
+    """
+    budget = affordable('reddit', len(targets))
+    if budget < len(targets):
+        logger.warning(f"⚠️ Reddit 쿼터 부족: 쿼리 {len(targets)}개 중 {budget}개만 검색합니다")
+        skipped = [None] * (len(targets) - budget)
+        return (run_searches(targets[:budget], use_async) if budget else []) + skipped
+    
+    if use_async:
+        results = search_many([(MULTIREDDIT, query, sort, SEARCH_LIMIT) for query, sort, _ in targets])
+        results = search_new_pages_async(targets, results)
+        results = [
+            tag_posts(submissions, sort, since_utc) if submissions is not None else None
+            for (_, sort, since_utc), submissions in zip(targets, results)
+        ]
+    else:
+        results = run_tasks(
+            'reddit',
+            lambda target: search_query_posts(get_thread_reddit(), *target),
+            targets,
+            describe=lambda target: f"r/{MULTIREDDIT} '{target[0]}'"
+        )
+    
+    failed = [query for (query, _, _), result in zip(targets, results) if result is None]
+    if failed and len(failed) < len(targets):
+        logger.warning(f"⚠️ 일부 쿼리 실패 ({len(failed)}/{len(targets)}개), 수집된 결과만 사용합니다")
+    return results
+
+def load_incremental_state():
+    """검색 쿼리별 고수위선과 누적 게시물 창 로드"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.setdefault('marks', {})
+    state.setdefault('window', {})
+    return state
+
+def save_incremental_state(state):
+    """증분 상태 저장 (임시 파일 후 교체)"""
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, STATE_FILE)
+
+def refresh_window_posts(window, skip_ids=()):
+    """누적 창 게시물의 업보트/댓글 수를 /api/info로 일괄 갱신하고 갱신 건수 반환
+
+    'new' 검색은 이미 본 게시물을 다시 돌려주지 않으므로, 처음 수집했을 때의 값(대개 0 근처)에
+    머물지 않도록 실행마다 갱신한다. 게시물 100개당 요청 1회이며, 실패한 묶음은 이전 값을 유지한다.
+    """
+    post_ids = [post_id for post_id in window if post_id not in skip_ids]
+    batches = [post_ids[i:i + REFRESH_BATCH_SIZE] for i in range(0, len(post_ids), REFRESH_BATCH_SIZE)]
+    if not batches:
+        return 0
+    
+    reddit = get_thread_reddit()
+    if reddit is None:
+        logger.warning("⚠️ Reddit 클라이언트가 없어 누적 창 스코어를 갱신하지 못했습니다")
+        return 0
+    
+    budget = affordable('reddit', len(batches))
+    if budget < len(batches):
+        logger.warning(f"⚠️ Reddit 쿼터 부족: 누적 창 갱신 {len(batches)}회 중 {budget}회만 요청합니다")
+    
+    updated = 0
+    for batch in batches[:budget]:
+        try:
+            submissions = list(reddit.info(fullnames=[f"t3_{post_id}" for post_id in batch]))
+        except Exception as e:
+            logger.warning(f"⚠️ 누적 창 게시물 갱신 실패 ({len(batch)}개): {e}")
+            continue
+        finally:
+            record('reddit')
+        for post in submissions:
+            if post.id in window:
+                window[post.id].update(score=post.score, num_comments=post.num_comments)
+                updated += 1
+    return updated
+
+def fetch_incremental_posts():
+    """고수위선 이후 새 게시물만 수집해 누적 창에 병합하고 창 전체 반환"""
+    state = load_incremental_state()
+    marks, window = state['marks'], state['window']
+    now_ts = datetime.now().timestamp()
+    
+    # 최근에 확인한 쿼리는 건너뜀 (재실행 시 호출 절감)
+    queries = plan_queries(KEYWORDS)
+    mark_keys = [f"{MULTIREDDIT}|{query}" for query in queries]
+    for key in set(marks) - set(mark_keys):
+        del marks[key]  # 키워드/서브레딧 구성이 바뀐 이전 쿼리
+    targets = [
+        (query, key, marks.get(key, {}).get('created_utc', 0))
+        for query, key in zip(queries, mark_keys)
+        if now_ts - marks.get(key, {}).get('checked_at', 0) >= RECHECK_INTERVAL_MINUTES * 60
+    ]
+    logger.info(f"🔍 증분 검색: 쿼리 {len(targets)}개 (최근 확인 {len(queries) - len(targets)}개 생략)")
+    
+    results = run_searches([(query, 'new', since_utc) for query, _, since_utc in targets])
+    
+    new_count = 0
+    fresh_ids = set()
+    for (query, key, since_utc), posts in zip(targets, results):
+        if posts is None:
+            continue  # 실패한 쿼리는 고수위선을 유지해 다음 실행에서 다시 시도
+        mark = marks.setdefault(key, {})
+        mark['checked_at'] = now_ts
+        if posts:
+            mark['created_utc'] = max(post['created_utc'] for post in posts)
+            mark['id'] = max(posts, key=lambda post: post['created_utc'])['id']
+        for post in posts:
+            fresh_ids.add(post['id'])
+            if post['id'] in window:
+                window[post['id']].update(score=post['score'], num_comments=post['num_comments'],
+                                          keyword=post['keyword'], keywords=post['keywords'])
+            else:
+                window[post['id']] = post
+                new_count += 1
+    
+    # 창 밖으로 밀려난 게시물 제거 후, 이번에 받지 않은 게시물의 업보트/댓글 수를 갱신하고 스코어 재계산
+    cutoff = now_ts - WINDOW_HOURS * 3600
+    for post_id in [post_id for post_id, post in window.items() if post['created_utc'] < cutoff]:
+        del window[post_id]
+    refreshed = refresh_window_posts(window, skip_ids=fresh_ids)
+    for post in window.values():
+        post['calculated_score'] = calculate_post_score(post['score'], post['num_comments'], post['created_utc'])
+    
+    save_incremental_state(state)
+    logger.info(f"✅ 증분 수집 완료: 신규 {new_count}개, 갱신 {refreshed}개, 누적 창 {len(window)}개")
+    return list(window.values())
+
+def get_thread_reddit():
+    """스레드별 Reddit 클라이언트 반환 (praw 인스턴스는 스레드 간 공유하지 않음)"""
+    reddit = getattr(_thread_local, 'reddit', None)
+    if reddit is None:
+        reddit = init_reddit()
+        _thread_local.reddit = reddit
+    return reddit
+
 def fetch_reddit_data():
     """Reddit 데이터 수집"""
-    reddit = init_reddit()
-    if not reddit:
+    # 동기 모드는 praw 클라이언트 필요 (비동기 모드는 OAuth API 직접 호출)
+    if not USE_ASYNC and not get_thread_reddit():
         logger.warning("⚠️ Reddit 클라이언트 초기화 실패. 더미 데이터를 사용합니다.")
         return generate_dummy_reddit_data()
     
     all_posts = []
     
-    # API 테스트
-    try:
-        test_subreddit = reddit.subreddit('test')
-        test_posts = list(test_subreddit.hot(limit=1))
-        if not test_posts:
-            logger.warning("⚠️ Reddit API 테스트 실패. 더미 데이터를 사용합니다.")
-            return generate_dummy_reddit_data()
-    except Exception as e:
-        logger.warning(f"⚠️ Reddit API 테스트 실패: {e}. 더미 데이터를 사용합니다.")
-        return generate_dummy_reddit_data()
-    
-    for keyword in KEYWORDS:
-        logger.info(f"🔍 '{keyword}' 키워드로 검색 중...")
-        posts = search_reddit_posts(reddit, keyword, limit=3)
-        all_posts.extend(posts)
+    if INCREMENTAL:
+        all_posts = fetch_incremental_posts()
+    else:
+        # 키워드를 OR 쿼리로 묶어 멀티레딧 1곳에서 검색 (쿼리 수만큼만 요청)
+        queries = plan_queries(KEYWORDS)
+        logger.info(f"🔍 키워드 {len(KEYWORDS)}개 × 서브레딧 {len(SUBREDDITS)}개를 쿼리 {len(queries)}개로 검색 중...")
+        results = run_searches([(query, 'top', 0) for query in queries])
+        seen = set()
+        for posts in results:
+            for post in posts or []:
+                if post['id'] not in seen:
+                    seen.add(post['id'])
+                    all_posts.append(post)
     
     # 스코어 기준으로 정렬
     all_posts.sort(key=lambda x: x['calculated_score'], reverse=True)
@@ -143,7 +383,8 @@ def generate_dummy_reddit_data():
             'author': 'market_watcher',
             'selftext': 'Tech stocks continue their strong performance with AI and semiconductor companies leading the charge.',
             'calculated_score': 1250,
-            'keyword': 'S&P500'
+            'keyword': 'S&P500',
+            'keywords': ['S&P500']
         },
         {
             'id': 'dummy2',
@@ -156,7 +397,8 @@ def generate_dummy_reddit_data():
             'author': 'tesla_bull',
             'selftext': 'Tesla reported strong Q4 results with record deliveries and improved margins.',
             'calculated_score': 890,
-            'keyword': 'Tesla'
+            'keyword': 'Tesla',
+            'keywords': ['Tesla']
         },
         {
             'id': 'dummy3',
@@ -169,7 +411,8 @@ def generate_dummy_reddit_data():
             'author': 'fed_watcher',
             'selftext': 'Federal Reserve meeting this week could provide clues about future rate cuts.',
             'calculated_score': 567,
-            'keyword': 'FOMC'
+            'keyword': 'FOMC',
+            'keywords': ['FOMC']
         },
         {
             'id': 'dummy4',
@@ -182,7 +425,8 @@ def generate_dummy_reddit_data():
             'author': 'crypto_analyst',
             'selftext': 'Bitcoin successfully broke through the $50k resistance level with strong volume.',
             'calculated_score': 2340,
-            'keyword': 'Bitcoin'
+            'keyword': 'Bitcoin',
+            'keywords': ['Bitcoin']
         },
         {
             'id': 'dummy5',
@@ -195,7 +439,8 @@ def generate_dummy_reddit_data():
             'author': 'tech_investor',
             'selftext': 'NVIDIA continues to dominate the AI chip market with strong demand from data centers.',
             'calculated_score': 678,
-            'keyword': 'NVIDIA'
+            'keyword': 'NVIDIA',
+            'keywords': ['NVIDIA']
         }
     ]
     
@@ -210,13 +455,17 @@ def generate_dummy_reddit_data():
     return reddit_data
 
 def save_data(data, date_str):
-    """데이터를 JSON 파일로 저장"""
+    """데이터를 JSON 파일로 저장 (게시물은 dedup_filter 스트리밍용 reddit.jsonl에도 한 줄씩 저장)"""
     os.makedirs(f'data/{date_str}', exist_ok=True)
     filepath = f'data/{date_str}/reddit.json'
     
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
     
+    with open(f'data/{date_str}/reddit.jsonl', 'w', encoding='utf-8') as f:
+        for post in data.get('posts', []):
+            f.write(json.dumps(post, ensure_ascii=False) + '\n')
+    
     logger.info(f"💾 데이터 저장: {filepath}")
     return filepath
 
@@ -4,11 +4,14 @@
 Yahoo Finance에서 S&P 500, Nasdaq, Dow, Dollar Index, WTI, BTC 데이터 수집
 """
 
-import yfinance as yf
+import sys
 import json
 import os
 from datetime import datetime, timezone, timedelta
 import logging
+from quote_engine import download_quotes, period_changes
+from live_quotes import poll, is_trading_today
+from market_calendar import plan_session
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,39 +27,61 @@ SYMBOLS = {
     'BTC': 'BTC-USD'
 }
 
-def fetch_market_data():
-    """Yahoo Finance에서 시장 데이터 수집"""
+def fetch_market_data(update=True):
+    """Yahoo Finance에서 시장 데이터 수집 (update=False면 로컬 이력만 사용)"""
     market_data = {
         'timestamp': datetime.now(timezone(timedelta(hours=9))).isoformat(),
-        'data': {}
+        'data': {},
+        'missing': []
     }
     
+    try:
+        quotes, _ = download_quotes(list(SYMBOLS.values()), update=update)
+    except Exception as e:
+        logger.error(f"❌ 시장 데이터 일괄 수집 실패: {e}")
+        market_data['missing'] = list(SYMBOLS.keys())
+        return market_data
+    
+    return build_market_data(quotes)
+
+def build_market_data(quotes):
+    """심볼별 시세 프레임을 raw_us.json 형식으로 변환"""
+    market_data = {
+        'timestamp': datetime.now(timezone(timedelta(hours=9))).isoformat(),
+        'data': {},
+        'missing': []
+    }
+    
+    # 전 종목 반올림을 한 번에 처리
+    rounded = quotes[['close', 'change_pct', 'change']].round(2)
+    
     for name, symbol in SYMBOLS.items():
-        try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period='2d')
-            
-            if len(hist) >= 2:
-                current_price = hist['Close'].iloc[-1]
-                prev_price = hist['Close'].iloc[-2]
-                change_pct = ((current_price - prev_price) / prev_price) * 100
-                
-                market_data['data'][name] = {
-                    'symbol': symbol,
-                    'current_price': round(current_price, 2),
-                    'change_pct': round(change_pct, 2),
-                    'change_amount': round(current_price - prev_price, 2)
-                }
-                
-                logger.info(f"✅ {name}: {current_price:.2f} ({change_pct:+.2f}%)")
-            else:
-                logger.warning(f"⚠️ {name}: 데이터 부족")
-                
-        except Exception as e:
-            logger.error(f"❌ {name} 데이터 수집 실패: {e}")
+        if symbol not in rounded.index:
+            logger.warning(f"⚠️ {name}: 데이터 부족")
+            market_data['missing'].append(name)
+            continue
+        
+        row = rounded.loc[symbol]
+        market_data['data'][name] = {
+            'symbol': symbol,
+            'current_price': float(row['close']),
+            'change_pct': float(row['change_pct']),
+            'change_amount': float(row['change'])
+        }
+        
+        logger.info(f"✅ {name}: {row['close']:.2f} ({row['change_pct']:+.2f}%)")
     
     return market_data
 
+def add_recap(market_data, session_date):
+    """주간 리캡용 최근 1주 등락률 추가"""
+    changes = period_changes(list(SYMBOLS.values()), session_date).round(2).dropna()
+    for item in market_data['data'].values():
+        if item['symbol'] in changes:
+            item['weekly_change_pct'] = float(changes[item['symbol']])
+    market_data['recap'] = True
+    return market_data
+
 def save_data(data, date_str):
     """데이터를 JSON 파일로 저장"""
     os.makedirs(f'data/{date_str}', exist_ok=True)
@@ -68,6 +93,18 @@ def save_data(data, date_str):
     logger.info(f"💾 데이터 저장: {filepath}")
     return filepath
 
+def run_live(date_str):
+    """장중 폴링 모드: 시세가 바뀔 때마다 raw_us.json을 최신 값으로 다시 씀 (휴장일이면 요청하지 않음)"""
+    if not is_trading_today('nyse'):
+        logger.info("📅 미국 시장 휴장일: 실시간 폴링을 건너뜁니다")
+        return None
+    
+    def on_update(latest, changed):
+        save_data(build_market_data(latest), date_str)
+    
+    poll(list(SYMBOLS.values()), 'nyse', f'data/{date_str}/live_us.jsonl', on_update)
+    return f'data/{date_str}/raw_us.json'
+
 def main():
     """메인 실행 함수"""
     logger.info("🌅 미국 시장 데이터 수집 시작")
@@ -75,8 +112,21 @@ def main():
     # 오늘 날짜
     today = datetime.now().strftime('%Y-%m-%d')
     
+    # 장중 폴링 모드
+    if '--live' in sys.argv[1:]:
+        return run_live(today)
+    
+    # 휴장일이면 수집을 건너뛰거나 직전 세션 데이터를 로컬 이력에서 재사용
+    plan = plan_session('morning')
+    if plan['action'] == 'skip':
+        logger.info("📅 미국 시장 휴장일: 수집을 건너뜁니다")
+        return None
+    
     # 데이터 수집
-    market_data = fetch_market_data()
+    market_data = fetch_market_data(update=plan['action'] == 'run')
+    market_data['session_date'] = plan['last_session'].isoformat()
+    if plan['action'] == 'recap':
+        add_recap(market_data, plan['last_session'])
     
     # 데이터 저장
     filepath = save_data(market_data, today)
@@ -6,10 +6,12 @@ GitHub Actions용 스케줄러 스크립트
 
 import subprocess
 import os
+import json
 import sys
 import logging
 from datetime import datetime
 import time
+from market_calendar import plan_session
 
 # 로깅 설정 (GitHub Actions에 최적화)
 logging.basicConfig(
@@ -25,6 +27,22 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 
+# 휴장일로 세션을 건너뛰었음을 워크플로에 알리는 표시 파일 (data/<날짜>/skipped_<세션>.json)
+SKIP_MARKER = os.path.join(os.getenv('DATA_DIR', 'data'), '{date}', 'skipped_{session}.json')
+
+def write_skip_marker(session_type, plan):
+    """건너뛴 세션 표시 파일 기록 (워크플로가 결과 파일 대신 이 파일을 보고 성공 처리)"""
+    path = SKIP_MARKER.format(date=datetime.now().strftime('%Y-%m-%d'), session=session_type)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'session_type': session_type,
+            'market_date': plan['market_date'].isoformat(),
+            'last_session': plan['last_session'].isoformat() if plan['last_session'] else None,
+            'timestamp': datetime.now().isoformat()
+        }, f, ensure_ascii=False, indent=2)
+    return path
+
 def run_command(command, description):
     """명령어 실행"""
     logger.info(f"🚀 {description} 시작")
@@ -175,21 +193,28 @@ def evening_pipeline():
     ):
         return False
     
-    # 2. 뉴스 필터링
+    # 2. 뉴스 수집 (여러 쿼리/카테고리, 실패해도 Reddit 데이터로 계속 진행)
+    if not run_command(
+        f"python scripts/fetch_news.py --ingest",
+        "뉴스 수집"
+    ):
+        logger.warning("⚠️ 뉴스 수집 실패했지만 계속 진행합니다")
+    
+    # 3. 뉴스 필터링
     if not run_command(
         f"python scripts/dedup_filter.py",
         "뉴스 필터링"
     ):
         return False
     
-    # 3. GPT 요약
+    # 4. GPT 요약
     if not run_command(
         f"python scripts/gpt_summarize.py evening",
         "GPT 요약 (저녁)"
     ):
         return False
     
-    # 4. Carousel 이미지 생성
+    # 5. Carousel 이미지 생성
     slides_file = f"data/{today}/slides_{today}.json"
     if not run_command(
         f"python scripts/local_carousel.py {slides_file}",
@@ -197,7 +222,7 @@ def evening_pipeline():
     ):
         return False
     
-    # 5. Buffer 업로드 (선택사항)
+    # 6. Buffer 업로드 (선택사항)
     if os.getenv('BUFFER_ACCESS_TOKEN') and os.getenv('BUFFER_PROFILE_ID'):
         if not run_command(
             f"python scripts/buffer_uploader.py evening {slides_file}",
@@ -207,7 +232,7 @@ def evening_pipeline():
     else:
         logger.info("ℹ️ Buffer 설정이 없어 업로드를 건너뜁니다")
     
-    # 6. Threads API 직접 포스팅 (선택사항)
+    # 7. Threads API 직접 포스팅 (선택사항)
     if os.getenv('FACEBOOK_ACCESS_TOKEN') and os.getenv('IG_USER_ID'):
         if not run_command(
             f"python scripts/threads_api_poster.py {slides_file}",
@@ -224,6 +249,13 @@ def run_single_session(session_type):
     """단일 세션 실행"""
     logger.info(f"🎯 세션 타입: {session_type}")
     
+    # 휴장일 skip 모드면 네트워크/GPT 호출 없이 종료 (reuse/recap은 각 스크립트가 처리)
+    if session_type in ("morning", "afternoon", "evening"):
+        plan = plan_session(session_type)
+        if plan['action'] == 'skip':
+            logger.info(f"📅 휴장일이라 {session_type} 세션을 건너뜁니다: {write_skip_marker(session_type, plan)}")
+            return True
+    
     if session_type == "morning":
         return morning_pipeline()
     elif session_type == "afternoon":
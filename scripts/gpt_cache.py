@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+GPT 응답 디스크 캐시
+(모델, 시스템 메시지, 프롬프트, temperature)의 해시를 키로 응답을 data/cache/gpt 아래에 저장해,
+입력 데이터가 그대로인 재실행(캐러셀/업로드 실패 후 등)은 API 호출 없이 바로 결과를 돌려줌
+
+사용법:
+    python scripts/gpt_cache.py list               # 캐시 항목 목록
+    python scripts/gpt_cache.py stats              # 항목 수/용량, 적중/미스 통계
+    python scripts/gpt_cache.py purge [--expired]  # 전체(또는 만료 항목) 삭제
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 캐시 디렉토리 / 적중 통계 파일
+CACHE_DIR = os.path.join(os.getenv('DATA_DIR', 'data'), 'cache', 'gpt')
+STATS_PATH = os.path.join(os.getenv('DATA_DIR', 'data'), 'cache', 'gpt_stats.json')
+
+# 캐시 비활성화 (항상 API 호출)
+CACHE_DISABLED = os.getenv('GPT_CACHE_DISABLED', 'false').lower() == 'true'
+
+# 항목 유효 시간 (초)
+CACHE_TTL = int(os.getenv('GPT_CACHE_TTL_HOURS', '24')) * 60 * 60
+
+# 전체 용량 상한 (바이트) - 넘으면 가장 오래 쓰지 않은 항목부터 삭제
+MAX_CACHE_BYTES = int(os.getenv('GPT_CACHE_MAX_MB', '50')) * 1024 * 1024
+
+def cache_key(model, system, prompt, temperature):
+    """모델/시스템 메시지/프롬프트/temperature의 SHA-256 해시"""
+    payload = json.dumps([model, system, prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def _update_stats(**counts):
+    """적중/미스/삭제 누적 횟수 갱신"""
+    stats = load_stats()
+    for name, value in counts.items():
+        stats[name] = stats.get(name, 0) + value
+    os.makedirs(os.path.dirname(STATS_PATH), exist_ok=True)
+    tmp_path = f"{STATS_PATH}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f)
+    os.replace(tmp_path, STATS_PATH)
+
+def load_stats():
+    """누적 통계 {'hits', 'misses', 'evictions'}"""
+    try:
+        with open(STATS_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def is_fresh(meta, ttl=CACHE_TTL):
+    """TTL 내 항목 여부"""
+    return time.time() - meta.get('stored_at', 0) < ttl
+
+def lookup(key, ttl=CACHE_TTL):
+    """TTL 내 응답 반환 (없거나 만료면 None), 적중 시 파일 수정 시각을 최근 사용 시각으로 갱신"""
+    path = _path(key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        entry = None
+
+    if entry is None or not is_fresh(entry, ttl):
+        _update_stats(misses=1)
+        return None
+
+    os.utime(path)
+    _update_stats(hits=1)
+    return entry['response']
+
+def store(key, response, model, temperature):
+    """응답 저장 (임시 파일 후 교체) 뒤 용량 상한 적용"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body = json.dumps({
+        'model': model,
+        'temperature': temperature,
+        'stored_at': time.time(),
+        'response': response
+    }, ensure_ascii=False)
+    tmp_path = f"{_path(key)}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(body)
+    os.replace(tmp_path, _path(key))
+    evict()
+
+def _scan():
+    """(key, 크기, 최근 사용 시각) 목록"""
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    return [(entry.name[:-5], entry.stat().st_size, entry.stat().st_mtime)
+            for entry in os.scandir(CACHE_DIR) if entry.name.endswith('.json')]
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """전체 용량이 max_bytes를 넘으면 오래 쓰지 않은 항목부터 삭제, 삭제 건수 반환"""
+    entries = _scan()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for key, size, _ in sorted(entries, key=lambda x: x[2]):
+        if total <= max_bytes:
+            break
+        os.remove(_path(key))
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"🗑️ GPT 캐시 용량 초과로 {removed}개 항목 삭제")
+        _update_stats(evictions=removed)
+    return removed
+
+def iter_entries():
+    """(key, 항목) 순회"""
+    for key, _, _ in sorted(_scan()):
+        try:
+            with open(_path(key), 'r', encoding='utf-8') as f:
+                yield key, json.load(f)
+        except (OSError, ValueError):
+            continue
+
+def purge(expired_only=False):
+    """캐시 항목 삭제, 삭제 건수 반환"""
+    removed = 0
+    for key, entry in list(iter_entries()):
+        if expired_only and is_fresh(entry):
+            continue
+        os.remove(_path(key))
+        removed += 1
+    return removed
+
+def main():
+    """캐시 점검 CLI"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+
+    if command == 'list':
+        for key, entry in iter_entries():
+            age = time.time() - entry.get('stored_at', 0)
+            state = '신선' if is_fresh(entry) else '만료'
+            print(f"{key[:12]}  {entry.get('model', ''):<10} t={entry.get('temperature')}  {state}  {age / 3600:6.1f}시간")
+    elif command == 'stats':
+        entries = _scan()
+        stats = load_stats()
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        hit_rate = stats.get('hits', 0) / lookups * 100 if lookups else 0
+        print(f"항목 {len(entries)}개, {sum(size for _, size, _ in entries) / 1024:.1f}KB "
+              f"(상한 {MAX_CACHE_BYTES / 1024 / 1024:.0f}MB, TTL {CACHE_TTL / 3600:.0f}시간)")
+        print(f"적중 {stats.get('hits', 0)}회, 미스 {stats.get('misses', 0)}회 (적중률 {hit_rate:.1f}%), "
+              f"용량 초과 삭제 {stats.get('evictions', 0)}개")
+    elif command == 'purge':
+        removed = purge(expired_only='--expired' in sys.argv[2:])
+        print(f"🗑️ {removed}개 항목 삭제")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
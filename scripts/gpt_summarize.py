@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
+from quota_ledger import record, wait_for
+import gpt_cache
 
 # 환경 변수 로드
 load_dotenv()
@@ -21,6 +23,21 @@ logger = logging.getLogger(__name__)
 # OpenAI 설정
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 GPT_MODEL = 'gpt-4o'  # 고정 모델
+GPT_TEMPERATURE = 0.7
+SYSTEM_MESSAGE = "당신은 금융 전문가입니다. 한국어로 응답하고, JSON 형식을 정확히 지켜주세요."
+
+# 휴장일 recap 모드 안내 (데이터에 'recap'이 있을 때 프롬프트 앞에 붙임)
+RECAP_INSTRUCTION = """
+※ 오늘은 휴장일입니다. 아래 데이터는 직전 개장일(session_date) 기준이며, weekly_change_pct는 최근 1주 등락률입니다.
+당일 시황이 아니라 '주간 리캡'으로 작성하고, 직전 개장일 날짜를 본문에 명시해주세요.
+"""
+
+# 저녁 프롬프트에 넣을 기사 필드 (제목/본문은 dedup_filter가 정제해 둔 값 사용)
+# filtered_score는 실행 시각 기준 시간 가중치가 들어가 매번 바뀌므로 넣지 않음 (기사는 이미 스코어 순으로 정렬됨)
+PROMPT_ARTICLE_FIELDS = ['source', 'published_at', 'keyword', 'cluster_size', 'related_titles']
+
+# 수집할 때마다 바뀌는 시각 필드 (프롬프트에서 빼서 같은 데이터면 같은 프롬프트·캐시 키가 되도록)
+VOLATILE_FIELDS = {'timestamp', 'fetched_at', 'updated_at'}
 
 def get_morning_prompt(data):
     """아침 프롬프트 생성"""
@@ -196,13 +213,46 @@ Top 3 이슈
 }}
 """
 
+def drop_volatile(data):
+    """수집 시각 필드(VOLATILE_FIELDS)를 중첩 구조 전체에서 뺀 사본"""
+    if isinstance(data, dict):
+        return {key: drop_volatile(value) for key, value in data.items() if key not in VOLATILE_FIELDS}
+    if isinstance(data, list):
+        return [drop_volatile(value) for value in data]
+    return data
+
+def build_prompt(prompt_func, data):
+    """세션 데이터로 프롬프트 렌더링 (수집 시각 필드 제외, 휴장일 recap이면 안내 추가)"""
+    data = drop_volatile(data)
+    prompt = prompt_func(data)
+    if isinstance(data, dict) and data.get('recap'):
+        prompt = RECAP_INSTRUCTION + prompt
+    return prompt
+
+def compact_articles(data):
+    """정제된 제목/본문만 남긴 기사 목록으로 교체 (원문과 정제본이 프롬프트에 중복으로 들어가지 않도록)"""
+    if not isinstance(data, dict) or not isinstance(data.get('articles'), list):
+        return data
+    
+    articles = []
+    for article in data['articles']:
+        compact = {
+            'title': article.get('cleaned_title') or article.get('title', ''),
+            'content': article.get('cleaned_content') or article.get('content', '')
+        }
+        compact.update({field: article[field] for field in PROMPT_ARTICLE_FIELDS if field in article})
+        articles.append(compact)
+    return {**data, 'articles': articles}
+
 def get_evening_prompt(data):
     """저녁 프롬프트 생성"""
+    data = compact_articles(data)
     return f"""
 당신은 금융 전문가입니다. 오늘의 주요 뉴스와 이벤트를 분석하여 인사이트를 제공해주세요.
 
 ## 요구사항
 - 모두 한글로, 존댓말 사용
+- 기사마다 서로 다른 주제의 대표 기사이며, cluster_size는 같은 주제를 다룬 기사 수(화제성), related_titles는 같은 주제의 다른 기사 제목입니다
 - 본문/댓글 각각 500자 이내
 - 핵심 데이터는 줄바꿈 + 개조식(• 또는 ①②③ 등)으로 표기
 - 본문 마지막에는 댓글 유도 문장(질문 or 행동 독려)
@@ -279,8 +329,23 @@ Tonight Checklist
 }}
 """
 
-def call_gpt(prompt, max_retries=2):
-    """GPT API 호출"""
+def prompt_cache_key(prompt):
+    """프롬프트의 GPT 응답 캐시 키 (모델/시스템 메시지/temperature 포함)"""
+    return gpt_cache.cache_key(GPT_MODEL, SYSTEM_MESSAGE, prompt, GPT_TEMPERATURE)
+
+def call_gpt(prompt, max_retries=2, refresh=False):
+    """GPT API 호출
+
+    같은 (모델, 시스템 메시지, 프롬프트, temperature) 응답이 캐시에 있으면 API를 호출하지 않는다.
+    refresh=True면 캐시를 건너뛰고 새로 호출해 덮어쓴다.
+    """
+    key = prompt_cache_key(prompt)
+    if not refresh and not gpt_cache.CACHE_DISABLED:
+        cached = gpt_cache.lookup(key)
+        if cached is not None:
+            logger.info(f"📦 GPT 캐시 적중: {key[:12]}")
+            return cached
+    
     if not OPENAI_API_KEY or OPENAI_API_KEY == 'your_openai_api_key_here':
         logger.error("❌ OpenAI API 키가 설정되지 않았습니다. .env 파일에서 OPENAI_API_KEY를 설정해주세요.")
         return None
@@ -292,20 +357,28 @@ def call_gpt(prompt, max_retries=2):
         return None
     
     for attempt in range(max_retries + 1):
+        # 분당 요청 한도가 차 있으면 풀릴 때까지 잠시 대기
+        if not wait_for('openai'):
+            logger.error("❌ OpenAI 분당 요청 한도 초과 상태가 계속됩니다.")
+            return None
+        
         try:
             logger.info(f"🤖 GPT 모델 사용: {GPT_MODEL}")
+            record('openai')
             response = client.chat.completions.create(
                 model=GPT_MODEL,
                 messages=[
-                    {"role": "system", "content": "당신은 금융 전문가입니다. 한국어로 응답하고, JSON 형식을 정확히 지켜주세요."},
+                    {"role": "system", "content": SYSTEM_MESSAGE},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
                 max_tokens=2000,
-                temperature=0.7
+                temperature=GPT_TEMPERATURE
             )
             
             result = json.loads(response.choices[0].message.content)
+            if not gpt_cache.CACHE_DISABLED:
+                gpt_cache.store(key, result, GPT_MODEL, GPT_TEMPERATURE)
             return result
             
         except json.JSONDecodeError as e:
@@ -346,11 +419,13 @@ def main():
     import sys
     
     try:
-        if len(sys.argv) != 2:
-            logger.error("❌ 사용법: python gpt_summarize.py [morning|afternoon|evening]")
+        args = [arg for arg in sys.argv[1:] if arg != '--refresh']
+        if len(args) != 1:
+            logger.error("❌ 사용법: python gpt_summarize.py [morning|afternoon|evening] [--refresh]")
             return None
         
-        session_type = sys.argv[1]
+        session_type = args[0]
+        refresh = '--refresh' in sys.argv[1:]
         today = datetime.now().strftime('%Y-%m-%d')
         
         logger.info(f"🤖 GPT 요약 시작: {session_type} 세션")
@@ -391,11 +466,11 @@ def main():
                     data = {'news': data, 'kr_index': kr_index_data}
         
         # 프롬프트 생성
-        prompt = prompt_func(data)
+        prompt = build_prompt(prompt_func, data)
         
         # GPT 호출
         try:
-            summary = call_gpt(prompt)
+            summary = call_gpt(prompt, refresh=refresh)
             if summary:
                 # 결과 저장
                 slides_file, thread_file = save_summary(summary, today, session_type)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+HTTP 응답 디스크 캐시
+URL과 파라미터 기준으로 응답을 data/cache/http 아래에 저장하고, 소스별 TTL과 ETag/Last-Modified 재검증 적용
+
+사용법:
+    python scripts/http_cache.py list            # 캐시 항목 목록
+    python scripts/http_cache.py stats           # 소스별 항목 수/용량
+    python scripts/http_cache.py show <key>      # 항목 메타데이터
+    python scripts/http_cache.py purge [--expired]  # 전체(또는 만료 항목) 삭제
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+from urllib.parse import urlparse
+import requests
+from http_session import get_session
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 캐시 디렉토리
+CACHE_DIR = os.path.join(os.getenv('DATA_DIR', 'data'), 'cache', 'http')
+
+# 캐시 비활성화 (강제 재요청)
+CACHE_DISABLED = os.getenv('HTTP_CACHE_DISABLED', 'false').lower() == 'true'
+
+# 소스별 TTL (초)
+SOURCE_TTLS = {
+    'newsapi': 30 * 60,
+    'data.go.kr': 6 * 60 * 60,
+    'yahoo': 10 * 60,
+    'default': 10 * 60
+}
+
+# 호스트 → 소스 매핑
+HOST_SOURCES = {
+    'newsapi.org': 'newsapi',
+    'apis.data.go.kr': 'data.go.kr',
+    'query1.finance.yahoo.com': 'yahoo',
+    'query2.finance.yahoo.com': 'yahoo'
+}
+
+# 메타데이터에 남기지 않을 인증 파라미터
+SECRET_PARAMS = {'serviceKey', 'apiKey', 'access_token', 'api_key'}
+
+def source_for(url):
+    """URL의 호스트로 소스 이름 결정"""
+    return HOST_SOURCES.get(urlparse(url).netloc, 'default')
+
+def cache_key(url, params=None):
+    """URL + 정렬된 파라미터의 SHA-256 해시"""
+    payload = json.dumps([url, sorted((params or {}).items())], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _paths(key):
+    return os.path.join(CACHE_DIR, f"{key}.json"), os.path.join(CACHE_DIR, f"{key}.body")
+
+def read_entry(key):
+    """(메타데이터, 본문) 반환 (없으면 (None, None))"""
+    meta_path, body_path = _paths(key)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return meta, body
+    except (OSError, ValueError):
+        return None, None
+
+def write_entry(key, body, meta):
+    """본문과 메타데이터 저장 (임시 파일 후 교체)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta_path, body_path = _paths(key)
+    for path, data, mode in ((body_path, body, 'wb'), (meta_path, json.dumps(meta, ensure_ascii=False, indent=2), 'w')):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, mode, **({} if mode == 'wb' else {'encoding': 'utf-8'})) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+def touch_entry(key, meta):
+    """재검증 성공 시 저장 시각만 갱신"""
+    meta['stored_at'] = time.time()
+    meta_path, _ = _paths(key)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+def is_fresh(meta, ttl=None):
+    """TTL 내 항목 여부"""
+    ttl = meta.get('ttl') if ttl is None else ttl
+    return time.time() - meta.get('stored_at', 0) < ttl
+
+def _redact(params):
+    return {k: ('***' if k in SECRET_PARAMS else v) for k, v in (params or {}).items()}
+
+def _to_response(url, meta, body):
+    """캐시 항목을 requests.Response로 복원"""
+    response = requests.Response()
+    response.status_code = meta.get('status', 200)
+    response.url = url
+    response.headers.update(meta.get('headers', {}))
+    response.encoding = meta.get('encoding')
+    response._content = body
+    response._content_consumed = True
+    response.from_cache = True
+    return response
+
+def cached_get(url, params=None, source=None, ttl=None, refresh=False, offline=False, validate=None, **kwargs):
+    """캐시를 거치는 GET 요청
+
+    TTL 내 항목은 네트워크 없이 반환하고, 만료 항목은 ETag/Last-Modified가 있으면
+    조건부 요청으로 재검증한다. 200 응답만 저장하며, validate(본문 바이트)를 주면 True인 본문만 저장한다
+    (HTTP 200으로 오류/빈 결과를 알리는 API가 그 응답을 TTL 동안 재사용하지 않도록).
+    offline=True(쿼터 소진 등)이면 만료 여부와 관계없이 캐시 항목만 반환하고, 없으면 None.
+    본문을 통째로 저장·복원하므로 stream=True는 지원하지 않는다 (ValueError).
+    """
+    if kwargs.get('stream'):
+        raise ValueError("cached_get은 stream=True를 지원하지 않습니다 (본문 전체를 캐시에 저장)")
+
+    if offline:
+        meta, body = read_entry(cache_key(url, params))
+        if meta is None:
+            return None
+        logger.info(f"📦 오프라인 캐시 사용: {source or source_for(url)} {url}")
+        return _to_response(url, meta, body)
+
+    if CACHE_DISABLED:
+        return get_session().get(url, params=params, **kwargs)
+
+    source = source or source_for(url)
+    ttl = SOURCE_TTLS.get(source, SOURCE_TTLS['default']) if ttl is None else ttl
+    key = cache_key(url, params)
+    meta, body = (None, None) if refresh else read_entry(key)
+
+    if meta is not None and is_fresh(meta, ttl):
+        logger.info(f"📦 캐시 적중: {source} {url}")
+        return _to_response(url, meta, body)
+
+    headers = dict(kwargs.pop('headers', None) or {})
+    if meta is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    response = get_session().get(url, params=params, headers=headers, **kwargs)
+
+    if response.status_code == 304 and meta is not None:
+        logger.info(f"📦 캐시 재검증: {source} {url}")
+        touch_entry(key, meta)
+        return _to_response(url, meta, body)
+
+    if response.status_code == 200 and validate is not None and not validate(response.content):
+        logger.info(f"📦 캐시 저장 생략 (사용할 수 없는 응답): {source} {url}")
+    elif response.status_code == 200:
+        write_entry(key, response.content, {
+            'url': url,
+            'params': _redact(params),
+            'source': source,
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() in ('content-type', 'etag', 'last-modified')},
+            'encoding': response.encoding,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'stored_at': time.time(),
+            'ttl': ttl,
+            'size': len(response.content)
+        })
+
+    response.from_cache = False
+    return response
+
+def iter_entries():
+    """(key, 메타데이터) 순회"""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for filename in sorted(os.listdir(CACHE_DIR)):
+        if filename.endswith('.json'):
+            key = filename[:-5]
+            try:
+                with open(os.path.join(CACHE_DIR, filename), 'r', encoding='utf-8') as f:
+                    yield key, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+def purge(expired_only=False):
+    """캐시 항목 삭제, 삭제 건수 반환"""
+    removed = 0
+    for key, meta in list(iter_entries()):
+        if expired_only and is_fresh(meta):
+            continue
+        for path in _paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+        removed += 1
+    return removed
+
+def main():
+    """캐시 점검 CLI"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+
+    if command == 'list':
+        for key, meta in iter_entries():
+            age = time.time() - meta.get('stored_at', 0)
+            state = '신선' if is_fresh(meta) else '만료'
+            print(f"{key[:12]}  {meta.get('source', ''):<10} {state}  {age / 60:6.1f}분  {meta.get('size', 0):>8}B  {meta.get('url', '')}")
+    elif command == 'stats':
+        summary = {}
+        for _, meta in iter_entries():
+            entry = summary.setdefault(meta.get('source', 'default'), {'entries': 0, 'fresh': 0, 'bytes': 0})
+            entry['entries'] += 1
+            entry['fresh'] += 1 if is_fresh(meta) else 0
+            entry['bytes'] += meta.get('size', 0)
+        for source, entry in summary.items():
+            print(f"{source:<12} 항목 {entry['entries']}개 (신선 {entry['fresh']}개), {entry['bytes'] / 1024:.1f}KB")
+    elif command == 'show' and len(sys.argv) > 2:
+        matches = [(key, meta) for key, meta in iter_entries() if key.startswith(sys.argv[2])]
+        for key, meta in matches:
+            print(json.dumps(dict(meta, key=key), ensure_ascii=False, indent=2))
+        if not matches:
+            print(f"항목 없음: {sys.argv[2]}")
+    elif command == 'purge':
+        removed = purge(expired_only='--expired' in sys.argv[2:])
+        print(f"🗑️ {removed}개 항목 삭제")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
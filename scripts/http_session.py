@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+공용 HTTP 세션 모듈
+호스트별 keep-alive 커넥션 풀, 기본 타임아웃, 429/5xx 재시도(지수 백오프 + 지터), 호스트별 통계 제공
+"""
+
+import os
+import time
+import random
+import atexit
+import threading
+import logging
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from quota_ledger import record_url
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 기본 (연결, 읽기) 타임아웃 (초)
+DEFAULT_TIMEOUT = (
+    float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('HTTP_READ_TIMEOUT', '20'))
+)
+
+# 재시도 설정
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+BACKOFF_BASE = 0.5   # 첫 재시도 대기 (초)
+BACKOFF_MAX = 30.0   # 최대 대기 (초)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# 재시도해도 안전한 메서드 (POST는 요청이 처리되지 않은 429만 재시도)
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# 커넥션 풀 크기
+POOL_CONNECTIONS = 20  # 캐시할 호스트별 풀 수
+POOL_MAXSIZE = 10      # 호스트당 유지할 커넥션 수
+
+class RetryingSession(requests.Session):
+    """기본 타임아웃과 백오프 재시도를 적용하고 호스트별 통계를 남기는 세션"""
+
+    def __init__(self, max_retries=MAX_RETRIES, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.max_retries = max_retries
+        self.default_timeout = timeout
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        method = method.upper()
+        host = urlparse(url).netloc
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(host, time.monotonic() - started, error=True)
+                record_url(url)
+                if attempt >= self.max_retries or not self._can_retry(method, None):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"⚠️ {host} 요청 오류, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+            else:
+                self._record(host, time.monotonic() - started, response=response, stream=kwargs.get('stream', False))
+                record_url(url, response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries \
+                        or not self._can_retry(method, response.status_code):
+                    return response
+                delay = self._retry_after(response) or self._backoff(attempt)
+                logger.warning(f"⚠️ {host} {response.status_code} 응답, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                response.close()
+
+            with self._stats_lock:
+                self.stats[host]['retries'] += 1
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _can_retry(method, status_code):
+        """재시도 가능 여부 (비멱등 요청은 중복 처리 위험이 없는 경우만)"""
+        return method in IDEMPOTENT_METHODS or status_code == 429
+
+    @staticmethod
+    def _backoff(attempt):
+        """지수 백오프 + full jitter"""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response):
+        """Retry-After 헤더(초) 해석"""
+        value = response.headers.get('Retry-After')
+        if value and value.isdigit():
+            return min(BACKOFF_MAX, float(value))
+        return None
+
+    def _record(self, host, latency, response=None, stream=False, error=False):
+        with self._stats_lock:
+            entry = self.stats.setdefault(host, {
+                'requests': 0, 'retries': 0, 'errors': 0, 'bytes': 0, 'latency_total': 0.0
+            })
+            entry['requests'] += 1
+            entry['latency_total'] += latency
+            if error:
+                entry['errors'] += 1
+            elif response is not None:
+                if stream:
+                    entry['bytes'] += int(response.headers.get('Content-Length') or 0)
+                else:
+                    entry['bytes'] += len(response.content)
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """프로세스 공용 세션 반환 (최초 호출 시 생성)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = RetryingSession()
+            atexit.register(log_stats)
+        return _session
+
+def get_stats():
+    """호스트별 통계 (평균 지연 포함) 반환"""
+    if _session is None:
+        return {}
+    with _session._stats_lock:
+        return {
+            host: dict(entry, latency_avg=entry['latency_total'] / entry['requests'] if entry['requests'] else 0.0)
+            for host, entry in _session.stats.items()
+        }
+
+def log_stats():
+    """호스트별 통계 로그 출력"""
+    for host, entry in get_stats().items():
+        logger.info(
+            f"📶 {host}: 요청 {entry['requests']}회, 재시도 {entry['retries']}회, 오류 {entry['errors']}회, "
+            f"평균 {entry['latency_avg'] * 1000:.0f}ms, {entry['bytes'] / 1024:.1f}KB"
+        )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+공용 키워드 사전과 다중 패턴 매처
+수집(fetch_reddit)과 스코어링(dedup_filter)이 같은 키워드 목록을 쓰고,
+Aho–Corasick 오토마톤으로 키워드 수와 관계없이 텍스트를 한 번만 훑어 일치 키워드를 찾음
+"""
+
+from collections import deque
+
+# 검색/스코어링 키워드
+KEYWORDS = ['S&P500', 'KOSPI', 'FOMC', 'AI', 'Bitcoin', 'Tesla', 'Apple', 'NVIDIA']
+
+def _is_word_char(ch):
+    """정규식 \\w와 같은 기준의 단어 문자 여부"""
+    return ch.isalnum() or ch == '_'
+
+class KeywordAutomaton:
+    """대소문자를 구분하지 않는 Aho–Corasick 오토마톤"""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.lengths = [len(keyword) for keyword in self.keywords]
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        # 트라이 구성
+        for position, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword.lower():
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state] += (position,)
+
+        # 너비 우선으로 실패 링크 연결 (접미사 키워드 출력도 함께 물려받음)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def iter_matches(self, text):
+        """(키워드 번호, 시작, 끝) 위치를 소문자화된 text 기준으로 차례로 반환"""
+        goto, fail, output, lengths = self.goto, self.fail, self.output, self.lengths
+        state = 0
+        for end, ch in enumerate(text.lower(), 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for position in output[state]:
+                yield position, end - lengths[position], end
+
+    def find(self, text, whole_word=False):
+        """text에 들어 있는 키워드 번호 집합 (whole_word면 앞뒤가 단어 문자가 아닌 경우만)"""
+        if not text:
+            return set()
+        if not whole_word:
+            return {position for position, _, _ in self.iter_matches(text)}
+
+        lowered = text.lower()
+        found = set()
+        for position, start, end in self.iter_matches(lowered):
+            if (start == 0 or not _is_word_char(lowered[start - 1])) and \
+                    (end == len(lowered) or not _is_word_char(lowered[end])):
+                found.add(position)
+        return found
+
+    def count(self, text, whole_word=False):
+        """text에 들어 있는 서로 다른 키워드 수"""
+        return len(self.find(text, whole_word))
+
+def compile_keyword_matcher(keywords):
+    """제목/본문에서 일치한 키워드 목록(단어 단위)을 돌려주는 함수 생성"""
+    automaton = KeywordAutomaton(keywords)
+
+    def match(text):
+        # keywords 순서로 정렬해 대표 키워드를 일정하게 유지
+        return [automaton.keywords[position] for position in sorted(automaton.find(text, whole_word=True))]
+
+    return match
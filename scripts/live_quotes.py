@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+장중 실시간 시세 폴링
+장이 열려 있는 동안 일정 간격으로 시세를 다시 받아, 바뀐 행만 델타 스냅샷(JSONL)으로 남기고
+프로세스 안의 최신 시세 테이블을 갱신
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+import pandas as pd
+from quote_engine import download_quotes, QUOTE_COLUMNS
+from market_calendar import is_trading_day
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 폴링 간격 (초)
+POLL_INTERVAL = float(os.getenv('LIVE_POLL_INTERVAL', '30'))
+
+# 시장별 정규장 시간 (현지 시각)
+MARKET_HOURS = {
+    'krx': (ZoneInfo('Asia/Seoul'), dtime(9, 0), dtime(15, 30)),
+    'nyse': (ZoneInfo('America/New_York'), dtime(9, 30), dtime(16, 0))
+}
+
+class LatestQuotes:
+    """심볼별 최신 시세 테이블 (폴링 스레드와 읽는 쪽이 동시에 접근해도 안전)"""
+
+    def __init__(self):
+        self._frame = pd.DataFrame(columns=QUOTE_COLUMNS + ['updated_at'])
+        self._lock = threading.Lock()
+
+    def merge(self, quotes, updated_at):
+        """새 시세를 반영하고 바뀐 행만 반환"""
+        with self._lock:
+            old = self._frame.reindex(quotes.index)[QUOTE_COLUMNS]
+            differs = (quotes[QUOTE_COLUMNS] != old) & ~(quotes[QUOTE_COLUMNS].isna() & old.isna())
+            changed = quotes[differs.any(axis=1)].copy()
+            changed['updated_at'] = updated_at
+
+            if not changed.empty:
+                rest = self._frame.drop(index=changed.index, errors='ignore')
+                self._frame = pd.concat([rest, changed]) if not rest.empty else changed
+            return changed
+
+    def snapshot(self, symbols=None):
+        """최신 시세 사본 (symbols를 주면 해당 심볼만)"""
+        with self._lock:
+            frame = self._frame.copy()
+        return frame.reindex(symbols).dropna(how='all') if symbols is not None else frame
+
+# 프로세스 공용 최신 시세 테이블
+latest = LatestQuotes()
+
+def is_trading_today(market, now=None):
+    """시장 현지 날짜 기준 개장일 여부 (주말·휴장일 제외)"""
+    zone = MARKET_HOURS[market][0]
+    return is_trading_day(market, (now or datetime.now(zone)).astimezone(zone).date())
+
+def is_market_open(market, now=None):
+    """정규장 시간 여부 (주말·휴장일 제외)"""
+    zone, open_time, close_time = MARKET_HOURS[market]
+    local = (now or datetime.now(zone)).astimezone(zone)
+    return is_trading_today(market, local) and open_time <= local.time() <= close_time
+
+def append_deltas(path, changed):
+    """바뀐 행만 JSONL에 추가"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for symbol, row in changed.iterrows():
+            record = {'symbol': symbol, **{k: (None if pd.isna(v) else v) for k, v in row.items()}}
+            f.write(json.dumps(record, ensure_ascii=False, default=float) + '\n')
+
+def load_latest(path):
+    """델타 JSONL을 재생해 심볼별 최신 시세 복원 (다른 프로세스에서 읽을 때 사용)"""
+    rows = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                rows[record.pop('symbol')] = record
+    return pd.DataFrame.from_dict(rows, orient='index', columns=QUOTE_COLUMNS + ['updated_at'])
+
+def poll(symbols, market, delta_path, on_update=None, interval=POLL_INTERVAL, max_polls=None):
+    """장이 열려 있는 동안 시세를 폴링
+
+    바뀐 행이 있을 때마다 delta_path에 추가하고 on_update(전체 최신 시세, 바뀐 행)를 호출한다.
+    장이 닫혀 있으면 한 번만 받고 끝낸다. 반환값은 폴링 횟수.
+    """
+    polls = 0
+    while True:
+        started = time.monotonic()
+        try:
+            quotes, _ = download_quotes(symbols, refresh=True)
+        except Exception as e:
+            logger.warning(f"⚠️ 실시간 시세 수집 실패: {e}")
+            quotes = None
+
+        if quotes is not None and not quotes.empty:
+            changed = latest.merge(quotes, datetime.now().isoformat())
+            if not changed.empty:
+                append_deltas(delta_path, changed)
+                if on_update:
+                    on_update(latest.snapshot(symbols), changed)
+            logger.info(f"📡 [{market}] 시세 갱신: 변경 {len(changed)}/{len(quotes)}개 심볼")
+
+        polls += 1
+        if not is_market_open(market) or (max_polls and polls >= max_polls):
+            break
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    logger.info(f"✅ [{market}] 실시간 폴링 종료: {polls}회")
+    return polls
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+거래소 영업일 달력 (NYSE / KRX)
+휴장일 표를 미리 펼쳐 두고 날짜별 개장 여부와 직전 개장일을 O(1)로 조회하며,
+세션(아침/점심/저녁)을 휴장일에 어떻게 처리할지 결정
+
+사용법:
+    python scripts/market_calendar.py [morning|afternoon|evening]   # 오늘 세션 처리 방식
+"""
+
+import os
+import sys
+import logging
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 휴장일 세션 처리 방식: skip(아무것도 하지 않음) / reuse(직전 세션 데이터 재사용) / recap(주간 리캡)
+CLOSED_MODE = os.getenv('MARKET_CLOSED_MODE', 'skip').lower()
+
+# 달력을 펼쳐 둘 연도 범위
+CALENDAR_YEARS = range(2024, 2028)
+
+# NYSE 규칙 외 임시 휴장일
+NYSE_SPECIAL_CLOSURES = [
+    date(2025, 1, 9)   # 카터 전 대통령 국가 애도일
+]
+
+# KRX 휴장일 (음력 명절·대체공휴일·선거일 포함, 매년 거래소 공지로 갱신)
+KRX_HOLIDAYS = [
+    # 2024
+    date(2024, 1, 1), date(2024, 2, 9), date(2024, 2, 12), date(2024, 3, 1), date(2024, 4, 10),
+    date(2024, 5, 1), date(2024, 5, 6), date(2024, 5, 15), date(2024, 6, 6), date(2024, 8, 15),
+    date(2024, 9, 16), date(2024, 9, 17), date(2024, 9, 18), date(2024, 10, 1), date(2024, 10, 3),
+    date(2024, 10, 9), date(2024, 12, 25), date(2024, 12, 31),
+    # 2025
+    date(2025, 1, 1), date(2025, 1, 27), date(2025, 1, 28), date(2025, 1, 29), date(2025, 1, 30),
+    date(2025, 3, 3), date(2025, 5, 1), date(2025, 5, 5), date(2025, 5, 6), date(2025, 6, 3),
+    date(2025, 6, 6), date(2025, 8, 15), date(2025, 10, 3), date(2025, 10, 6), date(2025, 10, 7),
+    date(2025, 10, 8), date(2025, 10, 9), date(2025, 12, 25), date(2025, 12, 31),
+    # 2026
+    date(2026, 1, 1), date(2026, 2, 16), date(2026, 2, 17), date(2026, 2, 18), date(2026, 3, 2),
+    date(2026, 5, 1), date(2026, 5, 5), date(2026, 5, 25), date(2026, 6, 3), date(2026, 8, 17),
+    date(2026, 9, 24), date(2026, 9, 25), date(2026, 10, 5), date(2026, 10, 9), date(2026, 12, 25),
+    date(2026, 12, 31),
+    # 2027
+    date(2027, 1, 1), date(2027, 2, 8), date(2027, 2, 9), date(2027, 3, 1), date(2027, 5, 5),
+    date(2027, 5, 13), date(2027, 8, 16), date(2027, 9, 14), date(2027, 9, 15), date(2027, 9, 16),
+    date(2027, 10, 4), date(2027, 10, 11), date(2027, 12, 27), date(2027, 12, 31)
+]
+
+# 세션별 기준 시장과 시장 날짜를 정할 시간대
+# 아침 세션은 방금 끝난 뉴욕 장, 점심은 당일 서울 장, 저녁은 어느 한쪽이라도 열린 날
+SESSION_MARKETS = {
+    'morning': (('nyse',), ZoneInfo('America/New_York')),
+    'afternoon': (('krx',), ZoneInfo('Asia/Seoul')),
+    'evening': (('krx', 'nyse'), ZoneInfo('Asia/Seoul'))
+}
+
+def _easter(year):
+    """부활절 날짜 (그레고리력 익명 알고리즘)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+def _nth_weekday(year, month, weekday, n):
+    """month월의 n번째 weekday (n=-1이면 마지막)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _observed(day):
+    """토요일 공휴일은 금요일, 일요일 공휴일은 월요일로 대체"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+def nyse_holidays(year):
+    """NYSE 정규 휴장일"""
+    new_year = date(year, 1, 1)
+    return {
+        # 1월 1일이 토요일이면 전년 12월 31일은 휴장하지 않음
+        new_year + timedelta(days=1) if new_year.weekday() == 6 else new_year,
+        _nth_weekday(year, 1, 0, 3),            # 마틴 루터 킹 데이
+        _nth_weekday(year, 2, 0, 3),            # 대통령의 날
+        _easter(year) - timedelta(days=2),      # 성금요일
+        _nth_weekday(year, 5, 0, -1),           # 메모리얼 데이
+        _observed(date(year, 6, 19)),           # 준틴스
+        _observed(date(year, 7, 4)),            # 독립기념일
+        _nth_weekday(year, 9, 0, 1),            # 노동절
+        _nth_weekday(year, 11, 3, 4),           # 추수감사절
+        _observed(date(year, 12, 25))           # 성탄절
+    }
+
+def _build_index(holidays):
+    """연도 범위의 날짜별 (개장 여부, 해당일 이전 마지막 개장일) 색인"""
+    start = date(CALENDAR_YEARS[0], 1, 1)
+    end = date(CALENDAR_YEARS[-1], 12, 31)
+    index = {}
+    last_open = None
+    day = start
+    while day <= end:
+        is_open = day.weekday() < 5 and day not in holidays
+        if is_open:
+            last_open = day
+        index[day] = (is_open, last_open)
+        day += timedelta(days=1)
+    return index
+
+_INDEX = {
+    'nyse': _build_index({day for year in CALENDAR_YEARS for day in nyse_holidays(year)} | set(NYSE_SPECIAL_CLOSURES)),
+    'krx': _build_index(set(KRX_HOLIDAYS))
+}
+
+def _as_date(day):
+    if day is None:
+        return date.today()
+    return day.date() if isinstance(day, datetime) else day
+
+def is_trading_day(market, day=None):
+    """개장일 여부 (달력 범위 밖은 주말만 휴장으로 간주)"""
+    day = _as_date(day)
+    entry = _INDEX[market].get(day)
+    return entry[0] if entry else day.weekday() < 5
+
+def last_session(market, day=None):
+    """day 당일 또는 그 이전의 마지막 개장일"""
+    day = _as_date(day)
+    entry = _INDEX[market].get(day)
+    if entry and entry[1]:
+        return entry[1]
+    while not is_trading_day(market, day):
+        day -= timedelta(days=1)
+    return day
+
+def previous_session(market, day=None):
+    """day 이전(당일 제외)의 마지막 개장일"""
+    return last_session(market, _as_date(day) - timedelta(days=1))
+
+def session_market_date(session_type, now=None):
+    """세션이 다루는 시장 날짜 (아침 세션은 뉴욕 현지 날짜 = 방금 끝난 장)"""
+    _, zone = SESSION_MARKETS[session_type]
+    return (now or datetime.now(zone)).astimezone(zone).date()
+
+def plan_session(session_type, now=None, mode=CLOSED_MODE):
+    """세션 처리 방식 결정
+
+    Returns:
+        {'action': 'run'|'skip'|'reuse'|'recap', 'market_date': 시장 날짜,
+         'last_session': 직전 개장일(열린 날이면 당일)}
+    """
+    markets, _ = SESSION_MARKETS[session_type]
+    market_date = session_market_date(session_type, now)
+    is_open = any(is_trading_day(market, market_date) for market in markets)
+    last = max(last_session(market, market_date) for market in markets)
+
+    if is_open:
+        action = 'run'
+    elif mode in ('reuse', 'recap'):
+        action = mode
+    else:
+        action = 'skip'
+
+    if action != 'run':
+        logger.info(f"📅 {session_type} 세션 휴장일({market_date}): {action} (직전 개장일 {last})")
+    return {'action': action, 'market_date': market_date, 'last_session': last}
+
+def main():
+    """세션 처리 방식 출력"""
+    sessions = sys.argv[1:] or list(SESSION_MARKETS)
+    for session_type in sessions:
+        if session_type not in SESSION_MARKETS:
+            print(__doc__)
+            return 1
+        plan = plan_session(session_type)
+        print(f"{session_type:<10} 시장 날짜 {plan['market_date']}  {plan['action']:<6} 직전 개장일 {plan['last_session']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+근접 중복 탐지 엔진
+문자 n-gram 슁글 + MinHash 서명 + LSH 밴딩으로 비슷한 후보만 골라 비교해, 기사 수에 선형으로 확장
+(문자 단위 슁글이라 한국어/영어 모두 처리)
+"""
+
+import re
+import zlib
+from difflib import SequenceMatcher
+import numpy as np
+
+# 슁글 길이 (문자 수)
+SHINGLE_SIZE = 3
+
+# MinHash 순열 수
+NUM_PERM = 128
+
+# 해시 순열용 메르센 소수와 고정 시드 (실행 간 서명 일치)
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+HASH_SEED = 1
+
+# LSH 후보 임계값 = similarity_threshold × 이 비율
+# SequenceMatcher 비율보다 슁글 자카드 유사도가 낮게 나오므로 후보는 넉넉히 뽑고 최종 판정은 원래 비율로 함
+CANDIDATE_RATIO = 0.5
+
+_WHITESPACE = re.compile(r'\s+')
+
+def shingles(text, size=SHINGLE_SIZE):
+    """소문자·공백 정리 후 문자 size-gram의 32비트 해시 집합"""
+    text = _WHITESPACE.sub(' ', (text or '').lower()).strip()
+    if not text:
+        return set()
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+def similarity(text1, text2):
+    """최종 중복 판정용 유사도 (기존 dedup_filter와 같은 SequenceMatcher 비율)"""
+    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+
+def exceeds(text1, text2, threshold):
+    """소문자화된 두 텍스트의 유사도가 threshold를 넘는지 확인 (상한값이 먼저 threshold 이하면 비싼 ratio 계산 생략)"""
+    matcher = SequenceMatcher(None, text1, text2)
+    return (matcher.real_quick_ratio() > threshold and matcher.quick_ratio() > threshold
+            and matcher.ratio() > threshold)
+
+class MinHasher:
+    """(a·x + b) mod p 순열 num_perm개로 MinHash 서명 계산"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=HASH_SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a·x가 p보다 작으면 x 순서가 그대로 유지되므로 a, b를 [1, p) 전체에서 뽑음 (uint64 곱은 2^64에서 순환)
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """슁글 집합의 서명 (빈 집합은 None)"""
+        if not shingle_set:
+            return None
+        values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        hashed = (np.outer(values, self.a) + self.b) % MERSENNE_PRIME
+        return hashed.min(axis=0)
+
+def band_layout(threshold, num_perm=NUM_PERM):
+    """(1/b)^(1/r)가 threshold에 가장 가까운 (밴드 수 b, 밴드당 행 수 r)"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands == 0:
+            break
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class LSHIndex:
+    """서명을 밴드별 버킷에 넣어 같은 버킷을 공유하는 후보 키를 조회"""
+
+    def __init__(self, threshold, num_perm=NUM_PERM):
+        self.bands, self.rows = band_layout(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, signature):
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, signature):
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        return candidates
+
+class NearDuplicateIndex:
+    """제목/본문 중 하나라도 similarity_threshold를 넘게 비슷한 기존 항목이 있는지 판정
+
+    LSH로 고른 후보에 대해서만 기존과 같은 SequenceMatcher 비율을 계산하므로,
+    판정 기준은 그대로 두고 비교 횟수만 후보 수로 줄어든다.
+    """
+
+    FIELDS = ('title', 'content')
+
+    def __init__(self, similarity_threshold=0.8, num_perm=NUM_PERM):
+        self.threshold = similarity_threshold
+        self.hasher = MinHasher(num_perm)
+        self.indexes = {field: LSHIndex(similarity_threshold * CANDIDATE_RATIO, num_perm) for field in self.FIELDS}
+        self.texts = []
+        self.comparisons = 0
+
+    def _signatures(self, texts, shingle_sets=None):
+        if shingle_sets is None:
+            shingle_sets = {field: shingles(texts[field]) for field in self.FIELDS}
+        return {field: self.hasher.signature(shingle_sets[field]) for field in self.FIELDS}
+
+    def _find(self, texts, signatures):
+        for field, signature in signatures.items():
+            if signature is None:
+                continue
+            for key in sorted(self.indexes[field].query(signature)):
+                self.comparisons += 1
+                if exceeds(texts[field], self.texts[key][field], self.threshold):
+                    return key
+        return None
+
+    def _add(self, texts, signatures):
+        key = len(self.texts)
+        self.texts.append(texts)
+        for field, signature in signatures.items():
+            if signature is not None:
+                self.indexes[field].add(key, signature)
+        return key
+
+    def find_duplicate(self, title, content, shingle_sets=None):
+        """중복이면 기존 항목 번호, 아니면 None
+
+        title/content는 소문자로 정규화된 텍스트, shingle_sets는 미리 계산한 {'title': 슁글, 'content': 슁글}
+        """
+        texts = {'title': title, 'content': content}
+        return self._find(texts, self._signatures(texts, shingle_sets))
+
+    def add(self, title, content, shingle_sets=None):
+        """항목 추가 후 번호 반환"""
+        texts = {'title': title, 'content': content}
+        return self._add(texts, self._signatures(texts, shingle_sets))
+
+    def add_if_new(self, title, content, shingle_sets=None):
+        """중복이 아니면 추가하고 True, 중복이면 False (서명은 한 번만 계산)"""
+        texts = {'title': title, 'content': content}
+        signatures = self._signatures(texts, shingle_sets)
+        if self._find(texts, signatures) is not None:
+            return False
+        self._add(texts, signatures)
+        return True
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+로컬 시세 이력 저장소
+심볼별 Parquet 파일에 일봉 OHLCV를 누적하고, 매 실행마다 새 봉만 Yahoo Finance에서 추가
+"""
+
+import os
+import time
+import pickle
+import logging
+from datetime import timedelta
+from urllib.parse import quote
+import yfinance as yf
+import pandas as pd
+from http_cache import cache_key, read_entry, write_entry, is_fresh, SOURCE_TTLS, CACHE_DISABLED
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 저장 디렉토리 (심볼별 파일 1개)
+HISTORY_DIR = os.path.join(os.getenv('DATA_DIR', 'data'), 'history')
+
+# 이력이 없는 심볼의 최초 수집 기간
+BOOTSTRAP_PERIOD = '1mo'
+
+# 저장 컬럼
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 캐시 키용 가상 URL
+YAHOO_DOWNLOAD_URL = 'yahoo://download'
+
+def _path(symbol):
+    """심볼별 Parquet 파일 경로 (^, = 등은 퍼센트 인코딩)"""
+    return os.path.join(HISTORY_DIR, f"{quote(symbol, safe='')}.parquet")
+
+def _normalize_index(frame):
+    """날짜 인덱스를 tz 없는 자정 기준으로 통일"""
+    index = pd.to_datetime(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.normalize()
+    frame.index.name = 'Date'
+    return frame
+
+def read_history(symbol, start=None, end=None, columns=None):
+    """심볼 이력 범위 조회 (없으면 빈 프레임)"""
+    path = _path(symbol)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns or OHLCV_FIELDS)
+
+    frame = pd.read_parquet(path, columns=columns)
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    if end is not None:
+        frame = frame[frame.index <= pd.Timestamp(end)]
+    return frame
+
+def read_range(symbols, start=None, end=None, field='Close'):
+    """여러 심볼의 한 필드를 (날짜 × 심볼) 프레임으로 조회"""
+    series = {symbol: read_history(symbol, start, end, columns=[field])[field] for symbol in symbols}
+    return pd.DataFrame(series).sort_index()
+
+def last_date(symbol):
+    """저장된 마지막 봉 날짜 (없으면 None)"""
+    frame = read_history(symbol, columns=['Close'])
+    return frame.index.max() if not frame.empty else None
+
+def append_bars(symbol, bars):
+    """새 봉 병합 저장 (같은 날짜는 새 값으로 덮어씀), 저장 후 전체 행 수 반환"""
+    bars = _normalize_index(bars[OHLCV_FIELDS].dropna(how='all'))
+    if bars.empty:
+        return 0
+
+    existing = read_history(symbol)
+    merged = pd.concat([existing, bars]) if not existing.empty else bars
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    path = _path(symbol)
+    tmp_path = f"{path}.tmp"
+    merged.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    return len(merged)
+
+def download_raw(symbols, refresh=False, **kwargs):
+    """yf.download 일괄 호출 (응답 캐시 TTL 적용, refresh=True면 캐시를 건너뛰고 새로 받음)"""
+    params = dict(kwargs, tickers=','.join(sorted(symbols)))
+    key = cache_key(YAHOO_DOWNLOAD_URL, params)
+    ttl = SOURCE_TTLS['yahoo']
+
+    if not CACHE_DISABLED and not refresh:
+        meta, body = read_entry(key)
+        if meta is not None and is_fresh(meta, ttl):
+            logger.info(f"📦 캐시 적중: yahoo {len(symbols)}개 심볼")
+            return pickle.loads(body)
+
+    raw = yf.download(
+        tickers=symbols,
+        group_by='column',
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+        **kwargs
+    )
+
+    if raw is not None and not raw.empty and not CACHE_DISABLED:
+        body = pickle.dumps(raw)
+        write_entry(key, body, {
+            'url': YAHOO_DOWNLOAD_URL,
+            'params': {k: str(v) for k, v in params.items()},
+            'source': 'yahoo',
+            'status': 200,
+            'stored_at': time.time(),
+            'ttl': ttl,
+            'size': len(body)
+        })
+    return raw
+
+def _symbol_bars(raw, symbol, symbols):
+    """일괄 다운로드 결과에서 심볼 1개의 OHLCV 추출"""
+    if isinstance(raw.columns, pd.MultiIndex):
+        if symbol not in raw.columns.get_level_values(1):
+            return pd.DataFrame(columns=OHLCV_FIELDS)
+        bars = raw.xs(symbol, axis=1, level=1)
+    elif len(symbols) == 1:
+        bars = raw
+    else:
+        return pd.DataFrame(columns=OHLCV_FIELDS)
+    return bars.reindex(columns=OHLCV_FIELDS)
+
+def update_history(symbols, refresh=False):
+    """저장소를 최신 봉까지 갱신 (심볼 그룹별 1회 일괄 다운로드)
+
+    이력이 있는 심볼은 마지막 봉 날짜가 같은 것끼리 묶어 그 날짜부터(당일 봉 갱신 포함) 받아,
+    오래 갱신되지 않은 심볼 하나 때문에 나머지까지 긴 기간을 다시 받지 않게 한다.
+    이력이 없는 심볼은 BOOTSTRAP_PERIOD만큼 한 번에 받는다.
+    장중 폴링처럼 진행 중인 당일 봉이 필요하면 refresh=True로 응답 캐시를 건너뛴다.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    last_dates = {symbol: last_date(symbol) for symbol in symbols}
+    known = [symbol for symbol in symbols if last_dates[symbol] is not None]
+    fresh = [symbol for symbol in symbols if last_dates[symbol] is None]
+
+    by_start = {}
+    for symbol in known:
+        by_start.setdefault(last_dates[symbol], []).append(symbol)
+
+    end = (pd.Timestamp.now().normalize() + timedelta(days=1)).strftime('%Y-%m-%d')
+    download_plan = [(group, {'start': start.strftime('%Y-%m-%d'), 'end': end})
+                     for start, group in sorted(by_start.items())]
+    if fresh:
+        download_plan.append((fresh, {'period': BOOTSTRAP_PERIOD}))
+
+    appended = 0
+    for group, kwargs in download_plan:
+        raw = download_raw(group, refresh=refresh, **kwargs)
+        if raw is None or raw.empty:
+            logger.warning(f"⚠️ 이력 갱신 결과가 비어 있습니다: {len(group)}개 심볼")
+            continue
+        for symbol in group:
+            if append_bars(symbol, _symbol_bars(raw, symbol, group)):
+                appended += 1
+
+    logger.info(f"🗄️ 시세 이력 갱신: {appended}/{len(symbols)}개 심볼 (신규 {len(fresh)}개)")
+    return appended
+
+def load_fields(symbols, lookback_days=14):
+    """최근 lookback_days 구간의 OHLCV를 필드별 (날짜 × 심볼) 프레임으로 조회"""
+    start = pd.Timestamp.now().normalize() - timedelta(days=lookback_days)
+    histories = {symbol: read_history(symbol, start=start) for symbol in symbols}
+    return {
+        field: pd.DataFrame({symbol: frame[field] for symbol, frame in histories.items() if field in frame})
+                 .reindex(columns=symbols).astype('float64').sort_index()
+        for field in OHLCV_FIELDS
+    }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+발행 이력 색인
+이전에 브리핑에 실은 기사의 지문(URL, Reddit id, 본문 MinHash 스케치)을 data/state/published.npz에 보관하고,
+여러 날 계속 올라오는 같은 이야기를 기사당 상수 시간에 걸러냄
+
+사용법:
+    python scripts/published_index.py          # 보관 중인 지문 수와 기간
+    python scripts/published_index.py clear    # 색인 삭제
+"""
+
+import os
+import sys
+import hashlib
+import logging
+from datetime import date
+import numpy as np
+from near_duplicate import MinHasher, LSHIndex, NUM_PERM
+from urls import canonical_url
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 색인 파일
+INDEX_PATH = os.path.join(os.getenv('DATA_DIR', 'data'), 'state', 'published.npz')
+
+# 보관 기간 (일)
+RETENTION_DAYS = int(os.getenv('PUBLISHED_RETENTION_DAYS', '7'))
+
+# 본문 스케치가 이 추정 자카드 유사도 이상이면 이미 다룬 이야기로 판단
+SKETCH_THRESHOLD = 0.5
+
+def _today():
+    """오늘 날짜의 서수 (일 단위 정수)"""
+    return date.today().toordinal()
+
+def fingerprint(kind, value):
+    """'url'/'reddit' 지문 문자열의 64비트 해시"""
+    digest = hashlib.blake2b(f"{kind}:{value}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def article_keys(article):
+    """기사의 (종류, 지문) 목록"""
+    keys = []
+    if article.get('url'):
+        keys.append(('url', fingerprint('url', canonical_url(article['url']))))
+    if article.get('reddit_id'):
+        keys.append(('reddit', fingerprint('reddit', article['reddit_id'])))
+    return keys
+
+class PublishedIndex:
+    """발행 기사 지문 색인 (지문 → 발행일 dict와 본문 서명 LSH)
+
+    당일 발행분은 조회에서 제외하므로, 같은 날 파이프라인을 다시 돌려도 자기 결과를 거르지 않는다.
+    """
+
+    def __init__(self, retention_days=RETENTION_DAYS):
+        self.retention_days = retention_days
+        self.hasher = MinHasher(NUM_PERM)
+        self.keys = {}
+        self.signatures = []
+        self.signature_days = []
+        self.lsh = LSHIndex(SKETCH_THRESHOLD, NUM_PERM)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH, retention_days=RETENTION_DAYS):
+        """색인 파일을 읽고 보관 기간이 지난 지문은 버림 (파일이 없거나 깨졌으면 빈 색인)"""
+        index = cls(retention_days)
+        if not os.path.exists(path):
+            return index
+        try:
+            with np.load(path) as stored:
+                keys, key_days = stored['keys'], stored['key_days']
+                signatures, signature_days = stored['signatures'], stored['signature_days']
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"⚠️ 발행 이력 색인 로드 실패, 새로 시작: {e}")
+            return index
+
+        oldest = _today() - retention_days
+        index.keys = {int(key): int(day) for key, day in zip(keys.tolist(), key_days.tolist()) if day > oldest}
+        # 순열 수가 바뀐 서명은 비교할 수 없으므로 버림
+        if signatures.ndim == 2 and signatures.shape[1] == NUM_PERM:
+            for signature, day in zip(signatures, signature_days.tolist()):
+                if day > oldest:
+                    index._add_signature(signature, int(day))
+        return index
+
+    def save(self, path=INDEX_PATH):
+        """임시 파일에 쓴 뒤 교체"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        signatures = np.array(self.signatures, dtype=np.uint64).reshape(-1, NUM_PERM)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            keys=np.fromiter(self.keys.keys(), dtype=np.uint64, count=len(self.keys)),
+            key_days=np.fromiter(self.keys.values(), dtype=np.int32, count=len(self.keys)),
+            signatures=signatures,
+            signature_days=np.array(self.signature_days, dtype=np.int32)
+        )
+        os.replace(tmp_path, path)
+
+    def _add_signature(self, signature, day):
+        self.lsh.add(len(self.signatures), signature)
+        self.signatures.append(signature)
+        self.signature_days.append(day)
+
+    def seen(self, article, content_shingles=None):
+        """이전 날 발행한 기사와 같은 이야기면 일치 종류('url'/'reddit'/'sketch'), 아니면 None"""
+        today = _today()
+        for kind, key in article_keys(article):
+            day = self.keys.get(key)
+            if day is not None and day < today:
+                return kind
+
+        signature = self.hasher.signature(content_shingles) if content_shingles else None
+        if signature is not None:
+            for position in self.lsh.query(signature):
+                if self.signature_days[position] < today and \
+                        (self.signatures[position] == signature).mean() >= SKETCH_THRESHOLD:
+                    return 'sketch'
+        return None
+
+    def add(self, article, content_shingles=None):
+        """발행한 기사 지문 추가"""
+        today = _today()
+        for _, key in article_keys(article):
+            self.keys[key] = today
+        signature = self.hasher.signature(content_shingles) if content_shingles else None
+        if signature is None:
+            return
+        # 같은 날 다시 실행해 똑같은 서명이 들어오면 발행일만 갱신
+        for position in self.lsh.query(signature):
+            if np.array_equal(self.signatures[position], signature):
+                self.signature_days[position] = today
+                return
+        self._add_signature(signature, today)
+
+def main():
+    """발행 이력 색인 점검 CLI"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    if command == 'status':
+        index = PublishedIndex.load()
+        days = list(index.keys.values()) + index.signature_days
+        print(f"지문 {len(index.keys)}개, 본문 스케치 {len(index.signatures)}개 (보관 {index.retention_days}일)")
+        if days:
+            print(f"발행일 {date.fromordinal(min(days))} ~ {date.fromordinal(max(days))}")
+    elif command == 'clear':
+        if os.path.exists(INDEX_PATH):
+            os.remove(INDEX_PATH)
+        print(f"🗑️ 발행 이력 색인 삭제: {INDEX_PATH}")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
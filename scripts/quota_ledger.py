@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+API 쿼터 사용량 장부
+외부 API 호출을 실행 간에 유지되는 SQLite 파일(data/state/quota.db)에 기록하고,
+호출 전에 남은 한도로 N회를 감당할 수 있는지 확인
+
+사용법:
+    python scripts/quota_ledger.py          # 제공자별 사용량/잔여 한도
+    python scripts/quota_ledger.py prune    # 가장 긴 집계 구간보다 오래된 기록 삭제
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+from contextlib import closing, contextmanager
+from urllib.parse import urlparse
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 장부 파일
+LEDGER_PATH = os.path.join(os.getenv('DATA_DIR', 'data'), 'state', 'quota.db')
+
+# 장부 비활성화 (기록/검사 모두 생략)
+LEDGER_DISABLED = os.getenv('QUOTA_LEDGER_DISABLED', 'false').lower() == 'true'
+
+# 제공자별 (집계 구간 초, 허용 호출 수) 목록
+QUOTAS = {
+    'newsapi': [(24 * 60 * 60, int(os.getenv('NEWSAPI_DAILY_LIMIT', '500')))],
+    'reddit': [(60, 100)],
+    'data.go.kr': [(24 * 60 * 60, int(os.getenv('DATA_GO_KR_DAILY_LIMIT', '10000')))],
+    'openai': [(60, int(os.getenv('OPENAI_RPM_LIMIT', '500')))]
+}
+
+# 호스트 → 제공자 매핑 (공용 세션 경유 호출 기록용)
+HOST_PROVIDERS = {
+    'newsapi.org': 'newsapi',
+    'apis.data.go.kr': 'data.go.kr',
+    'oauth.reddit.com': 'reddit',
+    'api.openai.com': 'openai'
+}
+
+def _connect():
+    os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
+    conn = sqlite3.connect(LEDGER_PATH, timeout=10)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS calls (provider TEXT NOT NULL, ts REAL NOT NULL, '
+        'count INTEGER NOT NULL, status INTEGER)'
+    )
+    conn.execute('CREATE INDEX IF NOT EXISTS calls_provider_ts ON calls (provider, ts)')
+    return conn
+
+@contextmanager
+def _ledger():
+    """장부 연결 1개로 트랜잭션 실행 (정상 종료 시 커밋, 예외 시 롤백) 후 연결을 닫음
+
+    sqlite3 연결의 with 문은 커밋만 하고 닫지 않으므로, 병렬 수집 스레드가 호출할 때
+    quota.db 핸들과 잠금이 쌓이지 않도록 매번 닫는다.
+    """
+    with closing(_connect()) as conn:
+        with conn:
+            yield conn
+
+def record(provider, count=1, status=None):
+    """호출 count회 기록 (응답 코드가 있으면 함께 저장)"""
+    if LEDGER_DISABLED:
+        return
+    try:
+        with _ledger() as conn:
+            conn.execute('INSERT INTO calls VALUES (?, ?, ?, ?)', (provider, time.time(), count, status))
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ 쿼터 장부 기록 실패 ({provider}): {e}")
+
+def record_url(url, status=None):
+    """URL 호스트로 제공자를 찾아 기록 (쿼터 대상이 아니면 무시)"""
+    provider = HOST_PROVIDERS.get(urlparse(url).netloc)
+    if provider:
+        record(provider, status=status)
+
+def used(provider, window):
+    """최근 window초 동안의 호출 수"""
+    if LEDGER_DISABLED:
+        return 0
+    try:
+        with _ledger() as conn:
+            row = conn.execute(
+                'SELECT COALESCE(SUM(count), 0) FROM calls WHERE provider = ? AND ts >= ?',
+                (provider, time.time() - window)
+            ).fetchone()
+        return row[0]
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ 쿼터 장부 조회 실패 ({provider}): {e}")
+        return 0
+
+def remaining(provider):
+    """모든 집계 구간 중 가장 적게 남은 호출 수 (한도 미등록 제공자는 None)"""
+    quotas = QUOTAS.get(provider)
+    if not quotas:
+        return None
+    return max(0, min(limit - used(provider, window) for window, limit in quotas))
+
+def can_afford(provider, calls=1):
+    """지금 calls회를 호출해도 한도를 넘지 않는지 확인"""
+    left = remaining(provider)
+    if left is None or left >= calls:
+        return True
+    logger.warning(f"⚠️ {provider} 쿼터 부족: 필요 {calls}회, 남은 한도 {left}회")
+    return False
+
+def affordable(provider, calls):
+    """calls회 중 지금 감당할 수 있는 호출 수"""
+    left = remaining(provider)
+    return calls if left is None else min(calls, left)
+
+def wait_for(provider, calls=1, max_wait=60, poll=5):
+    """분 단위 한도처럼 곧 풀리는 쿼터를 최대 max_wait초까지 기다림 (감당 가능하면 True)"""
+    deadline = time.monotonic() + max_wait
+    while not can_afford(provider, calls):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll)
+    return True
+
+def prune():
+    """가장 긴 집계 구간보다 오래된 기록 삭제, 삭제 건수 반환"""
+    horizon = max(window for quotas in QUOTAS.values() for window, _ in quotas)
+    with _ledger() as conn:
+        cursor = conn.execute('DELETE FROM calls WHERE ts < ?', (time.time() - horizon,))
+        return cursor.rowcount
+
+def main():
+    """쿼터 장부 점검 CLI"""
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    if command == 'status':
+        for provider, quotas in QUOTAS.items():
+            for window, limit in quotas:
+                count = used(provider, window)
+                print(f"{provider:<12} {window // 60:>5}분 구간  {count:>6}/{limit}회  (남은 한도 {max(0, limit - count)}회)")
+    elif command == 'prune':
+        print(f"🗑️ {prune()}건 삭제")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+일괄 시세 수집 엔진
+로컬 시세 이력을 새 봉만 일괄 갱신한 뒤, 등락을 로컬 데이터에서 벡터 연산으로 계산
+"""
+
+import pandas as pd
+import logging
+from datetime import timedelta
+from price_history import update_history, load_fields, read_range
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 결과 컬럼 (심볼 단위 1행)
+QUOTE_COLUMNS = ['close', 'prev_close', 'change', 'change_pct', 'open', 'high', 'low', 'volume']
+
+def download_quotes(symbols, refresh=False, update=True):
+    """심볼 목록의 최근 2개 거래일 시세 계산
+
+    Yahoo Finance 호출은 price_history.update_history의 일괄 다운로드(새 봉만)로 끝나고,
+    등락은 로컬 이력에서 계산한다.
+
+    Returns:
+        (quotes, missing): 심볼을 인덱스로 하는 QUOTE_COLUMNS 프레임과
+        2개 거래일 데이터를 얻지 못한 심볼 목록
+
+    refresh=True면 응답 캐시를 건너뛰어 장중 진행 중인 당일 봉을 반영한다.
+    update=False면 네트워크 없이 로컬 이력만으로 계산한다 (휴장일 직전 세션 재사용).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame(columns=QUOTE_COLUMNS), []
+
+    if update:
+        update_history(symbols, refresh=refresh)
+    fields = load_fields(symbols)
+
+    if fields['Close'].dropna(how='all').empty:
+        logger.warning(f"⚠️ 시세 이력이 비어 있습니다: {len(symbols)}개 심볼")
+        return pd.DataFrame(columns=QUOTE_COLUMNS), symbols
+
+    close = fields['Close']
+
+    # 심볼마다 휴장일이 달라 행 위치가 다르므로, 뒤에서부터 센 유효 종가 순번으로 최근/직전 거래일을 고름
+    valid = close.notna()
+    rank_from_end = valid.iloc[::-1].cumsum().iloc[::-1]
+    last_mask = valid & (rank_from_end == 1)
+    prev_mask = valid & (rank_from_end == 2)
+
+    def pick(frame, mask):
+        return frame.where(mask).max()
+
+    quotes = pd.DataFrame({
+        'close': pick(close, last_mask),
+        'prev_close': pick(close, prev_mask),
+        'open': pick(fields['Open'], last_mask),
+        'high': pick(fields['High'], last_mask),
+        'low': pick(fields['Low'], last_mask),
+        'volume': pick(fields['Volume'], last_mask)
+    }, index=symbols)
+
+    quotes['change'] = quotes['close'] - quotes['prev_close']
+    quotes['change_pct'] = quotes['change'] / quotes['prev_close'] * 100
+
+    complete = quotes['close'].notna() & quotes['prev_close'].notna()
+    missing = quotes.index[~complete].tolist()
+    quotes = quotes.loc[complete, QUOTE_COLUMNS]
+    quotes['volume'] = quotes['volume'].fillna(0).astype('int64')
+
+    logger.info(f"✅ 일괄 시세 수집 완료: {len(quotes)}/{len(symbols)}개 심볼")
+    if missing:
+        logger.warning(f"⚠️ 데이터 부족 심볼: {', '.join(missing)}")
+
+    return quotes, missing
+
+def period_changes(symbols, end, days=7):
+    """end 기준 최근 days일 등락률(%) (로컬 이력, days일 전 마지막 종가 대비)"""
+    end = pd.Timestamp(end)
+    close = read_range(symbols, start=end - timedelta(days=days + 10), end=end).reindex(columns=symbols)
+    if close.empty:
+        return pd.Series(index=symbols, dtype='float64')
+    
+    close = close.astype('float64').ffill()
+    base = close[close.index <= end - timedelta(days=days)]
+    if base.empty:
+        return pd.Series(index=symbols, dtype='float64')
+    return (close.iloc[-1] / base.iloc[-1] - 1) * 100
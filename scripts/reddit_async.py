@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Reddit 비동기 검색 클라이언트
+OAuth 앱 전용 토큰으로 검색 API를 직접 호출하고, 토큰 버킷으로 분당 요청 한도 안에서 동시에 실행
+"""
+
+import os
+import time
+import asyncio
+import logging
+from types import SimpleNamespace
+import aiohttp
+from dotenv import load_dotenv
+from quota_ledger import record
+
+# 환경변수 로드
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Reddit 설정
+REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
+REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
+REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'InsightPipeline/1.0')
+
+TOKEN_URL = 'https://www.reddit.com/api/v1/access_token'
+API_BASE_URL = 'https://oauth.reddit.com'
+
+# OAuth 요청 한도 (분당 100회)
+RATE_LIMIT = 100
+RATE_PERIOD = 60.0
+RATE_BURST = 10  # 한 번에 몰아서 보낼 수 있는 최대 요청 수
+
+# 동시 요청 한도
+MAX_CONCURRENCY = int(os.getenv('REDDIT_CONCURRENCY', '8'))
+
+# 요청 1건당 타임아웃 (초)
+REQUEST_TIMEOUT = 10
+
+# 429 응답 재시도 횟수
+MAX_RETRIES = 2
+
+class TokenBucket:
+    """rate/period 속도로 채워지는 토큰 버킷 (요청마다 토큰 1개 소비)"""
+
+    def __init__(self, rate=RATE_LIMIT, period=RATE_PERIOD, burst=RATE_BURST):
+        self.fill_rate = rate / period
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """토큰이 생길 때까지 대기"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+async def get_access_token(session):
+    """앱 전용(client_credentials) 액세스 토큰 발급"""
+    auth = aiohttp.BasicAuth(REDDIT_CLIENT_ID or '', REDDIT_CLIENT_SECRET or '')
+    async with session.post(TOKEN_URL, data={'grant_type': 'client_credentials'}, auth=auth) as response:
+        response.raise_for_status()
+        payload = await response.json()
+    if 'access_token' not in payload:
+        raise aiohttp.ClientError(f"토큰 발급 실패: {payload.get('error', payload)}")
+    return payload['access_token']
+
+async def _search(session, bucket, subreddit, query, sort, limit, after=None):
+    """검색 요청 1건 (after를 주면 그 게시물 다음 페이지, 429는 X-Ratelimit-Reset만큼 기다렸다가 재시도)"""
+    params = {'q': query, 'sort': sort, 't': 'day', 'limit': limit, 'restrict_sr': 'on', 'raw_json': 1}
+    if after:
+        params['after'] = after
+    for attempt in range(MAX_RETRIES + 1):
+        await bucket.acquire()
+        async with session.get(f"{API_BASE_URL}/r/{subreddit}/search", params=params) as response:
+            record('reddit', status=response.status)
+            if response.status == 429 and attempt < MAX_RETRIES:
+                delay = float(response.headers.get('X-Ratelimit-Reset') or 2 ** attempt)
+                logger.warning(f"⚠️ Reddit 429 응답, {delay:.0f}초 후 재시도 ({attempt + 1}/{MAX_RETRIES})")
+                await asyncio.sleep(min(delay, RATE_PERIOD))
+                continue
+            response.raise_for_status()
+            payload = await response.json()
+            return [SimpleNamespace(**child['data']) for child in payload['data']['children']]
+
+async def _search_one(session, bucket, semaphore, subreddit, query, sort, limit, after=None):
+    """검색 1건 실행 (실패 시 로그를 남기고 None)"""
+    async with semaphore:
+        try:
+            return await _search(session, bucket, subreddit, query, sort, limit, after)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ r/{subreddit} '{query}' 요청 타임아웃 ({REQUEST_TIMEOUT}초)")
+            return None
+        except aiohttp.ClientResponseError as e:
+            logger.warning(f"⚠️ r/{subreddit} '{query}' 요청 실패: {e.status}")
+            return None
+        except (aiohttp.ClientError, KeyError, ValueError) as e:
+            logger.warning(f"⚠️ r/{subreddit} '{query}' 수집 중 오류: {e}")
+            return None
+
+async def search_many_async(searches, concurrency=MAX_CONCURRENCY):
+    """(서브레딧, 쿼리, 정렬, 개수[, after]) 목록을 동시에 검색하고 입력 순서대로 게시물 목록 반환
+
+    게시물은 praw Submission과 같은 속성 이름(id, title, permalink, created_utc 등)을 가진다.
+    토큰 발급에 실패하면 전부 None을 반환한다.
+    """
+    started = time.monotonic()
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers={'User-Agent': REDDIT_USER_AGENT}) as session:
+        try:
+            token = await get_access_token(session)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"❌ Reddit 토큰 발급 실패: {e}")
+            return [None] * len(searches)
+        session.headers['Authorization'] = f"bearer {token}"
+
+        bucket = TokenBucket()
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(*[
+            _search_one(session, bucket, semaphore, subreddit, query, sort, limit, *after)
+            for subreddit, query, sort, limit, *after in searches
+        ])
+
+    succeeded = sum(1 for result in results if result is not None)
+    logger.info(f"⚡ [reddit] 비동기 검색 완료: {succeeded}/{len(searches)}건, {time.monotonic() - started:.2f}초")
+    return results
+
+def search_many(searches, concurrency=MAX_CONCURRENCY):
+    """search_many_async의 동기 진입점"""
+    if not searches:
+        return []
+    return asyncio.run(search_many_async(searches, concurrency))
@@ -12,6 +12,7 @@ from datetime import datetime
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 import time
+from market_calendar import plan_session
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -139,21 +140,28 @@ def evening_pipeline():
     ):
         return False
     
-    # 2. 뉴스 필터링
+    # 2. 뉴스 수집 (여러 쿼리/카테고리, 실패해도 Reddit 데이터로 계속 진행)
+    if not run_command(
+        f"python scripts/fetch_news.py --ingest",
+        "뉴스 수집"
+    ):
+        logger.warning("⚠️ 뉴스 수집 실패했지만 계속 진행합니다")
+    
+    # 3. 뉴스 필터링
     if not run_command(
         f"python scripts/dedup_filter.py",
         "뉴스 필터링"
     ):
         return False
     
-    # 3. GPT 요약
+    # 4. GPT 요약
     if not run_command(
         f"python scripts/gpt_summarize.py evening",
         "GPT 요약 (저녁)"
     ):
         return False
     
-    # 4. Carousel 이미지 생성
+    # 5. Carousel 이미지 생성
     slides_file = f"data/{today}/slides_{today}.json"
     if not run_command(
         f"python scripts/local_carousel.py {slides_file}",
@@ -161,7 +169,7 @@ def evening_pipeline():
     ):
         return False
     
-    # 5. Buffer 업로드
+    # 6. Buffer 업로드
     if not run_command(
         f"python scripts/buffer_uploader.py evening {slides_file}",
         "Buffer 업로드 (저녁)"
@@ -173,6 +181,11 @@ def evening_pipeline():
 
 def run_single_session(session_type):
     """단일 세션 실행"""
+    # 휴장일 skip 모드면 네트워크/GPT 호출 없이 종료 (reuse/recap은 각 스크립트가 처리)
+    if session_type in ("morning", "afternoon", "evening") and plan_session(session_type)['action'] == 'skip':
+        logger.info(f"📅 휴장일이라 {session_type} 세션을 건너뜁니다")
+        return True
+    
     if session_type == "morning":
         return morning_pipeline()
     elif session_type == "afternoon":
@@ -189,24 +202,27 @@ def start_scheduler():
     
     # 아침 파이프라인 (07:05)
     scheduler.add_job(
-        morning_pipeline,
+        run_single_session,
         CronTrigger(hour=7, minute=5),
+        args=['morning'],
         id='morning_pipeline',
         name='아침 파이프라인'
     )
     
     # 점심 파이프라인 (15:40)
     scheduler.add_job(
-        afternoon_pipeline,
+        run_single_session,
         CronTrigger(hour=15, minute=40),
+        args=['afternoon'],
         id='afternoon_pipeline',
         name='점심 파이프라인'
     )
     
     # 저녁 파이프라인 (20:00)
     scheduler.add_job(
-        evening_pipeline,
+        run_single_session,
         CronTrigger(hour=20, minute=0),
+        args=['evening'],
         id='evening_pipeline',
         name='저녁 파이프라인'
     )
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+한국어/영어 혼용 토크나이저
+유니코드 정규화(분리된 한글 자모 결합 포함) 후 한글 어절의 조사를 떼고 영어 단어는 소문자화·어간 추출해,
+조사나 띄어쓰기만 다른 문장이 같은 토큰·슁글이 되도록 함 (토큰 정규화 결과는 캐시)
+"""
+
+import re
+import zlib
+import unicodedata
+from functools import lru_cache
+
+# 문자 n-gram 슁글 길이
+SHINGLE_SIZE = 3
+
+# 정규화 결과 캐시 크기 (어휘 수)
+VOCAB_CACHE_SIZE = 100000
+
+# 떼어낼 조사 (긴 것부터 검사)
+PARTICLES = sorted([
+    '으로부터', '에서부터', '에게서', '으로서', '으로써', '이라고', '이라는', '에서는', '에서도', '에게는',
+    '으로는', '까지', '부터', '에서', '에게', '한테', '으로', '처럼', '보다', '라고', '라는', '이나', '이며',
+    '과', '와', '은', '는', '이', '가', '을', '를', '에', '의', '도', '만', '로'
+], key=len, reverse=True)
+
+# 영문/숫자 뒤에 붙어 따로 떨어진 조사 토큰 (NVIDIA의 → nvidia, 의) 은 버림
+PARTICLE_TOKENS = frozenset(PARTICLES)
+
+# 조사를 뗀 뒤 남아야 하는 최소 글자 수 (주가→주, 유가→유 처럼 명사 끝 글자를 떼지 않도록)
+MIN_STEM_LENGTH = 2
+
+# 영어 접미사 규칙 (접미사, 대체) - 앞에서부터 처음 맞는 규칙 1개만 적용한 뒤 끝의 e 제거
+# (rate/rates/rated/rating → rat, rally/rallies/rallied → rally)
+ENGLISH_SUFFIXES = [
+    ('sses', 'ss'), ('ies', 'y'), ('ied', 'y'), ('ing', ''), ('ed', ''), ('s', '')
+]
+
+# 영어 어간 최소 길이
+MIN_ENGLISH_STEM = 3
+
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[a-z]+|\d+|[^\W\d_a-z가-힣]+')
+
+@lru_cache(maxsize=VOCAB_CACHE_SIZE)
+def normalize_token(token):
+    """토큰 1개 정규화 (한글은 조사 제거, 영어는 어간 추출)"""
+    if '가' <= token[0] <= '힣':
+        for particle in PARTICLES:
+            if token.endswith(particle) and len(token) - len(particle) >= MIN_STEM_LENGTH:
+                return token[:-len(particle)]
+        return token
+    if token.isascii() and token.isalpha():
+        for suffix, replacement in ENGLISH_SUFFIXES:
+            if token.endswith(suffix) and (suffix == 'sses' or not token.endswith('ss')) and \
+                    len(token) - len(suffix) + len(replacement) >= MIN_ENGLISH_STEM:
+                token = token[:-len(suffix)] + replacement
+                break
+        if token.endswith('e') and len(token) - 1 >= MIN_ENGLISH_STEM:
+            token = token[:-1]
+    return token
+
+def tokenize(text):
+    """텍스트 → 정규화된 토큰 목록"""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKC', text).lower()
+    return [normalize_token(token) for token in TOKEN_PATTERN.findall(text) if token not in PARTICLE_TOKENS]
+
+def compact(tokens):
+    """띄어쓰기 차이를 없앤 비교용 문자열 (토큰을 공백 없이 이어 붙임)"""
+    return ''.join(tokens)
+
+def shingles(tokens, size=SHINGLE_SIZE):
+    """공백 없이 이은 토큰 문자열의 문자 size-gram 32비트 해시 집합"""
+    text = compact(tokens)
+    if not text:
+        return set()
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
@@ -7,9 +7,9 @@ Meta의 공식 Threads API를 활용하여 포스팅을 자동화합니다.
 import os
 import json
 import logging
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
+from http_session import get_session
 
 # 환경변수 로드
 load_dotenv()
@@ -72,7 +72,7 @@ class ThreadsAPIPoster:
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = get_session().get(url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -127,7 +127,7 @@ class ThreadsAPIPoster:
                 'text': main_text,  # message 대신 text 사용
                 'media_type': 'text'  # 텍스트 포스트 타입
             }
-            response = requests.post(url, data=payload)
+            response = get_session().post(url, data=payload)
             
             if response.status_code == 200:
                 result = response.json()
@@ -142,7 +142,7 @@ class ThreadsAPIPoster:
                     'access_token': self.access_token
                 }
                 
-                publish_response = requests.post(publish_url, data=publish_params)
+                publish_response = get_session().post(publish_url, data=publish_params)
                 
                 if publish_response.status_code == 200:
                     publish_result = publish_response.json()
@@ -165,7 +165,7 @@ class ThreadsAPIPoster:
                         'reply_to_id': post_id  # 메인 포스트에 댓글 달기
                     }
                     
-                    comment_response = requests.post(comment_url, data=comment_payload)
+                    comment_response = get_session().post(comment_url, data=comment_payload)
                     
                     if comment_response.status_code == 200:
                         comment_result = comment_response.json()
@@ -181,7 +181,7 @@ class ThreadsAPIPoster:
                             'access_token': self.access_token
                         }
                         
-                        publish_response = requests.post(publish_url, data=publish_params)
+                        publish_response = get_session().post(publish_url, data=publish_params)
                         
                         if publish_response.status_code == 200:
                             publish_result = publish_response.json()
@@ -218,7 +218,7 @@ class ThreadsAPIPoster:
                 'metric': 'impressions,reach,profile_views'
             }
             
-            response = requests.get(url, params=params)
+            response = get_session().get(url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
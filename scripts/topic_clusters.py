@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+기사 주제 클러스터링
+정제된 기사를 해시 희소 TF-IDF 벡터로 바꿔 미니배치 구면 k-평균으로 묶고,
+주제마다 대표 기사 1개와 클러스터 크기만 요약 단계로 넘김 (네트워크/GPU 불필요)
+"""
+
+import os
+import time
+import zlib
+import logging
+import numpy as np
+from text_tokenizer import tokenize
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 최대 클러스터 수 (기사 수보다 많으면 기사 수로 줄임)
+MAX_CLUSTERS = int(os.getenv('TOPIC_CLUSTERS', '20'))
+
+# 해시 특성 차원 (2^16)
+HASH_BITS = 16
+
+# 미니배치 크기 / 반복 횟수 / 고정 시드
+BATCH_SIZE = 256
+MAX_ITERATIONS = 50
+RANDOM_SEED = 42
+
+# 중심 코사인 유사도가 이 값 이상인 클러스터는 같은 주제로 합침 (k가 실제 주제 수보다 클 때 쪼개짐 방지)
+MERGE_SIMILARITY = 0.5
+
+# 대표 기사에 함께 붙일 같은 클러스터 기사 제목 수
+RELATED_TITLES = 3
+
+def _hash_token(token, mask=(1 << HASH_BITS) - 1):
+    """토큰 → (특성 번호, 부호)"""
+    value = zlib.crc32(token.encode('utf-8'))
+    return value & mask, 1.0 if value >> 31 else -1.0
+
+def vectorize(documents):
+    """토큰 목록들을 L2 정규화된 해시 TF-IDF 희소 행렬(CSR: data, indices, indptr)로 변환"""
+    cache = {}
+    indptr = [0]
+    indices = []
+    data = []
+    for tokens in documents:
+        row = {}
+        for token in tokens:
+            if token not in cache:
+                cache[token] = _hash_token(token)
+            column, sign = cache[token]
+            row[column] = row.get(column, 0.0) + sign
+        # 부호 해시끼리 상쇄된 특성은 버림
+        for column, value in row.items():
+            if value:
+                indices.append(column)
+                data.append(value)
+        indptr.append(len(indices))
+
+    indices = np.array(indices, dtype=np.int64)
+    data = np.array(data, dtype=np.float32)
+    indptr = np.array(indptr, dtype=np.int64)
+
+    # IDF (부드러운 IDF: log((1+n)/(1+df)) + 1)
+    document_frequency = np.bincount(indices, minlength=1 << HASH_BITS)
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    data = np.sign(data) * (1 + np.log(np.abs(data))) * idf[indices]
+
+    # 행별 L2 정규화
+    rows = np.repeat(np.arange(len(documents)), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(documents)))
+    data = (data / np.where(norms[rows] > 0, norms[rows], 1)).astype(np.float32)
+    return data, indices, indptr
+
+def _gather(matrix, row_ids):
+    """선택한 행들의 (행 위치, 특성 번호, 값) 평탄화 배열"""
+    data, indices, indptr = matrix
+    starts = indptr[row_ids]
+    lengths = indptr[row_ids + 1] - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    positions = offsets + np.arange(lengths.sum())
+    return np.repeat(np.arange(len(row_ids)), lengths), indices[positions], data[positions]
+
+def _similarities(matrix, row_ids, centers):
+    """선택한 행과 중심들의 코사인 유사도 (행 수 × 중심 수)"""
+    rows, columns, values = _gather(matrix, row_ids)
+    products = centers[:, columns] * values
+    return np.stack([np.bincount(rows, weights=product, minlength=len(row_ids)) for product in products], axis=1)
+
+def _row_sums(matrix, row_ids, width):
+    """선택한 행들을 더한 밀집 벡터"""
+    _, columns, values = _gather(matrix, row_ids)
+    return np.bincount(columns, weights=values, minlength=width).astype(np.float32)
+
+def cluster_documents(documents, n_clusters=MAX_CLUSTERS, seed=RANDOM_SEED):
+    """문서(토큰 목록)들의 클러스터 번호 배열 (k-means++ 초기화 + 미니배치 구면 k-평균)"""
+    count = len(documents)
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    n_clusters = min(n_clusters, count)
+    width = 1 << HASH_BITS
+    matrix = vectorize(documents)
+    rng = np.random.RandomState(seed)
+    all_rows = np.arange(count)
+
+    # k-means++ 초기화 (코사인 거리 1 - 유사도 기준)
+    centers = np.zeros((n_clusters, width), dtype=np.float32)
+    centers[0] = _row_sums(matrix, np.array([rng.randint(count)]), width)
+    distance = 1 - _similarities(matrix, all_rows, centers[:1])[:, 0]
+    for center in range(1, n_clusters):
+        weights = np.clip(distance, 0, None) ** 2
+        total = weights.sum()
+        row = rng.choice(count, p=weights / total) if total > 0 else rng.randint(count)
+        centers[center] = _row_sums(matrix, np.array([row]), width)
+        distance = np.minimum(distance, 1 - _similarities(matrix, all_rows, centers[center:center + 1])[:, 0])
+
+    # 미니배치 갱신: 학습률 1/n의 순차 갱신은 누적 평균과 같으므로 배치 단위로 한 번에 반영
+    seen = np.zeros(n_clusters)
+    previous = None
+    for _ in range(MAX_ITERATIONS):
+        if count <= BATCH_SIZE:
+            # 전체가 한 배치면 배정이 더 이상 바뀌지 않을 때 종료
+            batch = all_rows
+            labels = _similarities(matrix, batch, centers).argmax(axis=1)
+            if previous is not None and np.array_equal(labels, previous):
+                break
+            previous = labels
+        else:
+            batch = rng.choice(count, size=BATCH_SIZE, replace=False)
+            labels = _similarities(matrix, batch, centers).argmax(axis=1)
+        for label in np.unique(labels):
+            members = batch[labels == label]
+            total = seen[label] + len(members)
+            centers[label] = (seen[label] * centers[label] + _row_sums(matrix, members, width)) / total
+            seen[label] = total
+        norms = np.linalg.norm(centers, axis=1, keepdims=True)
+        centers /= np.where(norms > 0, norms, 1)
+
+    labels = _similarities(matrix, all_rows, centers).argmax(axis=1)
+    return _merge_clusters(labels, centers)
+
+def _merge_clusters(labels, centers, threshold=MERGE_SIMILARITY):
+    """중심끼리 threshold 이상 비슷한 클러스터를 하나의 번호로 합침"""
+    parent = list(range(len(centers)))
+
+    def root(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    similar = np.argwhere(np.triu(centers @ centers.T, k=1) >= threshold)
+    for left, right in similar.tolist():
+        parent[root(right)] = root(left)
+    return np.array([root(label) for label in labels.tolist()], dtype=np.int64)
+
+def article_tokens(article):
+    """정제 제목/본문의 정규화 토큰 (dedup_filter 결과 필드 사용, 없으면 원문)"""
+    title = article.get('cleaned_title') or article.get('title', '')
+    content = article.get('cleaned_content') or article.get('content', '')
+    return tokenize(f"{title} {content}")
+
+def pick_topics(articles, k, n_clusters=MAX_CLUSTERS, tokens=None):
+    """기사를 주제로 묶어 클러스터마다 스코어가 가장 높은 대표 기사를 고르고 상위 k개 주제 반환
+
+    tokens는 articles와 같은 순서의 정규화 토큰 목록(dedup_filter의 ArticleFeatures.tokens)으로, 없으면 다시 토큰화한다.
+    대표 기사에는 cluster_size(같은 주제 기사 수)와 related_titles(같은 주제의 다른 기사 제목)를 붙인다.
+    """
+    if not articles:
+        return []
+    started = time.monotonic()
+    if tokens is None:
+        tokens = [article_tokens(article) for article in articles]
+    labels = cluster_documents(tokens, n_clusters)
+
+    clusters = {}
+    for article, label in zip(articles, labels.tolist()):
+        clusters.setdefault(label, []).append(article)
+
+    representatives = []
+    for members in clusters.values():
+        members.sort(key=lambda x: x.get('filtered_score', 0), reverse=True)
+        representative = members[0]
+        representative['cluster_size'] = len(members)
+        representative['related_titles'] = [m.get('title', '') for m in members[1:1 + RELATED_TITLES]]
+        representatives.append(representative)
+
+    representatives.sort(key=lambda x: x.get('filtered_score', 0), reverse=True)
+    logger.info(f"🧩 주제 클러스터링: 기사 {len(articles)}개 → 주제 {len(clusters)}개 ({time.monotonic() - started:.2f}초)")
+    return representatives[:k]
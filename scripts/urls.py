@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+URL 정규화 유틸리티
+수집(fetch_news)과 발행 이력 색인(published_index)이 같은 기준으로 기사 URL을 비교하도록 공용으로 둠 (표준 라이브러리만 사용)
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 정규화 시 제거할 추적용 URL 파라미터
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ocid', 'cmpid', 'ref', 'src', 'guccounter'}
+
+def canonical_url(url):
+    """비교용 URL (소문자 호스트, www/추적 파라미터/프래그먼트/끝 슬래시 제거)"""
+    parts = urlsplit((url or '').strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit(('https', host, parts.path.rstrip('/'), query, ''))
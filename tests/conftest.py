@@ -0,0 +1,5 @@
+import os
+import sys
+
+# scripts/ 모듈을 스크립트 실행 때와 같은 방식(from module import x)으로 가져오도록 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
@@ -0,0 +1,12 @@
+from dedup_filter import prepare_article
+
+def _keywords(title, content=''):
+    features = prepare_article({'title': title, 'content': content})
+    return features.title_keywords, features.content_keywords
+
+def test_keyword_inside_other_words_is_not_counted():
+    assert _keywords('He said the chair will maintain rates again') == (0, 0)
+
+def test_keywords_match_whole_normalized_words():
+    assert _keywords('AI stocks lift the S&P 500', 'Nvidia and Tesla rallied as KOSPI rose') == (2, 3)
+    assert _keywords('AI가 이끈 랠리') == (1, 0)
@@ -0,0 +1,34 @@
+import time
+import pandas as pd
+from fetch_us_markets import build_market_data
+from gpt_summarize import build_prompt, prompt_cache_key, get_morning_prompt, get_evening_prompt
+
+def _quotes():
+    return pd.DataFrame(
+        {'close': [5000.0, 16000.0], 'change_pct': [0.5, -0.25], 'change': [25.0, -40.0]},
+        index=['^GSPC', '^IXIC']
+    )
+
+def test_same_market_data_gives_same_cache_key():
+    first = build_market_data(_quotes())
+    time.sleep(0.01)
+    second = build_market_data(_quotes())
+    assert first['timestamp'] != second['timestamp']
+    assert prompt_cache_key(build_prompt(get_morning_prompt, first)) == \
+        prompt_cache_key(build_prompt(get_morning_prompt, second))
+
+def test_changed_market_data_changes_cache_key():
+    changed = _quotes()
+    changed.loc['^GSPC', 'close'] = 5001.0
+    assert prompt_cache_key(build_prompt(get_morning_prompt, build_market_data(_quotes()))) != \
+        prompt_cache_key(build_prompt(get_morning_prompt, build_market_data(changed)))
+
+def test_evening_prompt_ignores_fetch_times_and_scores():
+    def news(fetched_at, score):
+        return {
+            'timestamp': fetched_at,
+            'articles': [{'title': 'Fed holds rates', 'content': 'The Fed held rates.', 'source': 'NewsAPI',
+                          'published_at': '2025-01-15T10:00:00', 'fetched_at': fetched_at, 'filtered_score': score}]
+        }
+    assert build_prompt(get_evening_prompt, news('2025-01-15T20:00:00', 31.2)) == \
+        build_prompt(get_evening_prompt, news('2025-01-15T20:30:00', 29.8))